@@ -6,9 +6,28 @@ Version: 0.0.2a
 __version__ = "0.0.2a"
 __author__ = "Your Name"
 
-from .editor import Editor
-from .buffer import Buffer
-from .modes import Mode
-from .window import Window
+__all__ = ["Editor", "Buffer", "Mode", "Window", "__version__"]
 
-__all__ = ["Editor", "Buffer", "Mode", "Window", "__version__"]
\ No newline at end of file
+# Public names and the submodules they live in, imported on first access
+_LAZY_ATTRS = {
+    "Editor": ".editor",
+    "Buffer": ".buffer",
+    "Mode": ".modes",
+    "Window": ".window",
+}
+
+
+def __getattr__(name):
+    """Import the public classes lazily so importing pyvim stays cheap."""
+    if name in _LAZY_ATTRS:
+        import importlib
+        
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    """Include the lazily imported names in dir(pyvim)."""
+    return sorted(set(globals()) | set(__all__))
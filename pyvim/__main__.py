@@ -3,7 +3,6 @@
 
 import sys
 import argparse
-from .editor import Editor
 
 
 def main():
@@ -14,6 +13,9 @@ def main():
     
     args = parser.parse_args()
     
+    # Deferred so that --help and --version skip loading the editor
+    from .editor import Editor
+    
     try:
         editor = Editor()
         editor.run(args.filename)
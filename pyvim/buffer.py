@@ -1,14 +1,58 @@
 """Enhanced buffer management for the editor."""
 
+import codecs
 import os
 import re
+import shutil
+import tempfile
+from collections import deque
+from contextlib import contextmanager
 from typing import List, Optional, Tuple
 from .undo import UndoManager
 
 
+# Run of word characters (alphanumerics and underscore)
+_WORD_RE = re.compile(r'\w*')
+
+
+def _word_start(line: str, x: int) -> int:
+    """Return the start of the word run ending just before column x."""
+    if 0 < x <= len(line):
+        # Match the run backwards over the reversed prefix so the scan
+        # stays inside the regex engine
+        return x - _WORD_RE.match(line[x - 1::-1]).end()
+    return x
+
+
+def _word_end(line: str, x: int) -> int:
+    """Return the end of the word run starting at column x."""
+    if x < len(line):
+        return _WORD_RE.match(line, x).end()
+    return x
+
+
+def _detect_line_ending(data) -> str:
+    """Return the line ending of str or bytes data, judged by its first CR."""
+    cr, lf = ('\r', '\n') if isinstance(data, str) else (b'\r', b'\n')
+    i = data.find(cr)
+    if i == -1:
+        return '\n'
+    return '\r\n' if data[i + 1:i + 2] == lf else '\r'
+
+
 class Buffer:
     """Represents a text buffer with undo support."""
     
+    __slots__ = (
+        'filename', 'display_name', 'lines', 'modified',
+        'cursor_x', 'cursor_y', 'offset_y', 'offset_x',
+        'undo_manager', 'marks', 'jump_list', 'jump_index',
+        'last_search', 'file_encoding', 'line_ending', 'file_size',
+    )
+    
+    # Lines joined per write when saving
+    SAVE_BATCH_LINES = 1024
+    
     def __init__(self, filename: Optional[str] = None):
         self.filename = filename
         self.display_name = filename
@@ -20,13 +64,14 @@ class Buffer:
         self.offset_x = 0  # Horizontal scroll offset
         self.undo_manager = UndoManager(self)
         self.marks = {}  # Mark positions
-        self.jump_list = []  # Jump history
+        self.jump_list = deque(maxlen=100)  # Jump history
         self.jump_index = -1
-        self.last_search = None
+        self.last_search = None  # Compiled pattern of the last search
         self.file_encoding = 'utf-8'
         self.line_ending = '\n'  # \n for Unix, \r\n for Windows
+        self.file_size: Optional[int] = None  # Bytes on disk at last load/save
         
-        if filename and os.path.exists(filename):
+        if filename:
             self.load_file()
             
     def load_file(self):
@@ -34,35 +79,46 @@ class Buffer:
         if not self.filename:
             return
             
-        # Try different encodings
+        # Read the raw bytes once; encodings are tried on the in-memory copy
+        try:
+            with open(self.filename, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return  # New file, keep the empty buffer
+        except Exception as e:
+            self.lines = [f"Error loading file: {e}"]
+            return
+            
+        # A UTF-8 byte order mark swaps in utf-8-sig; the 8-bit fallbacks
+        # still apply when the rest of the file is not valid UTF-8
         encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        
+        if raw.startswith(codecs.BOM_UTF8):
+            encodings[0] = 'utf-8-sig'
+            
+        # Bulk-decode the whole file; only the decode is retried
         for encoding in encodings:
             try:
-                with open(self.filename, 'r', encoding=encoding) as f:
-                    content = f.read()
-                    
-                # Detect line ending
-                if '\r\n' in content:
-                    self.line_ending = '\r\n'
-                elif '\r' in content:
-                    self.line_ending = '\r'
-                else:
-                    self.line_ending = '\n'
-                    
-                self.lines = content.split(self.line_ending) if content else [""]
-                self.file_encoding = encoding
-                self.modified = False
-                self.undo_manager.load_persistent_undo(self.filename)
+                content = raw.decode(encoding)
                 break
             except UnicodeDecodeError:
                 continue
-            except Exception as e:
-                self.lines = [f"Error loading file: {e}"]
-                break
+        else:
+            self.lines = ["Error loading file: unknown encoding"]
+            return
+            
+        self.file_size = len(raw)
+        
+        # Detect line ending on the raw bytes, stopping at the first CR
+        self.line_ending = _detect_line_ending(raw)
+            
+        # Split once, in C, on the detected line ending
+        self.lines = content.split(self.line_ending) if content else [""]
+        self.file_encoding = encoding
+        self.modified = False
+        self.undo_manager.load_persistent_undo(self.filename)
                 
-    def save_file(self, filename: Optional[str] = None):
-        """Save buffer content to file."""
+    def save_file(self, filename: Optional[str] = None) -> int:
+        """Save buffer content to file and return the number of bytes written."""
         if filename:
             self.filename = filename
             self.display_name = filename
@@ -70,27 +126,73 @@ class Buffer:
         if not self.filename:
             raise ValueError("No filename specified")
             
-        # Create backup
-        if os.path.exists(self.filename):
-            backup_name = self.filename + "~"
-            try:
-                with open(self.filename, 'rb') as src:
-                    with open(backup_name, 'wb') as dst:
-                        dst.write(src.read())
-            except:
-                pass
+        # Create backup; a file that does not exist yet has nothing to back up
+        try:
+            shutil.copyfile(self.filename, self.filename + "~")
+        except OSError:
+            pass
                 
+        # Write through symlinks to the real file, via a temporary file
+        # that is atomically renamed over it once fully written
+        target = os.path.realpath(self.filename)
+        tmp_name = None
+        
         try:
-            content = self.line_ending.join(self.lines)
-            with open(self.filename, 'w', encoding=self.file_encoding) as f:
-                f.write(content)
+            # A fresh hidden name beside the target never clobbers an
+            # existing file
+            fd, tmp_name = tempfile.mkstemp(dir=os.path.dirname(target),
+                                            prefix='.' + os.path.basename(target))
+            lines = self.lines
+            ending = self.line_ending
+            # Encode incrementally so a BOM is only emitted once, and so
+            # the byte count comes from the writes rather than a stat
+            encode = codecs.getincrementalencoder(self.file_encoding)().encode
+            size = 0
+            with open(fd, 'wb', buffering=1 << 20) as f:
+                # Join in fixed-size batches rather than building the
+                # whole document as one string
+                for i in range(0, len(lines), self.SAVE_BATCH_LINES):
+                    if i:
+                        size += f.write(encode(ending))
+                    size += f.write(encode(ending.join(lines[i:i + self.SAVE_BATCH_LINES])))
+                size += f.write(encode('', True))
+                    
+            try:
+                shutil.copymode(target, tmp_name)
+            except OSError:
+                # A new file gets the usual umask-based mode, not mkstemp's 0600
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(tmp_name, 0o666 & ~umask)
+            os.replace(tmp_name, target)
+            self.file_size = size
             self.modified = False
             self.undo_manager.mark_save_point()
             self.undo_manager.save_persistent_undo(self.filename)
-            return True
+            return size
         except Exception as e:
+            if tmp_name is not None:
+                try:
+                    os.remove(tmp_name)
+                except FileNotFoundError:
+                    pass
             raise Exception(f"Error saving file: {e}")
             
+    @contextmanager
+    def batch_edit(self, description: str = ""):
+        """Group the edits made inside the block into a single undo step."""
+        undo_manager = self.undo_manager
+        if not undo_manager.batch_depth:
+            # The snapshot is taken by the first edit inside the block
+            undo_manager.batch_description = description
+        undo_manager.batch_depth += 1
+        try:
+            yield self
+        finally:
+            undo_manager.batch_depth -= 1
+            if not undo_manager.batch_depth:
+                undo_manager.batch_description = None
+            
     def insert_char(self, char: str):
         """Insert character at cursor position."""
         self.undo_manager.save_state("Insert character")
@@ -101,6 +203,16 @@ class Buffer:
         self.cursor_x += 1
         self.modified = True
         
+    def insert_str(self, text: str):
+        """Insert a single-line string at cursor position in one splice."""
+        self.undo_manager.save_state("Insert text")
+        line = self.lines[self.cursor_y]
+        self.lines[self.cursor_y] = (
+            line[:self.cursor_x] + text + line[self.cursor_x:]
+        )
+        self.cursor_x += len(text)
+        self.modified = True
+        
     def delete_char(self):
         """Delete character before cursor (backspace behavior)."""
         self.undo_manager.save_state("Delete character")
@@ -112,27 +224,29 @@ class Buffer:
             self.cursor_x -= 1
             self.modified = True
         elif self.cursor_y > 0:
-            # Join with previous line
-            self.cursor_x = len(self.lines[self.cursor_y - 1])
-            self.lines[self.cursor_y - 1] += self.lines[self.cursor_y]
-            del self.lines[self.cursor_y]
+            # Join with previous line in a single splice
+            prev_line = self.lines[self.cursor_y - 1]
+            self.cursor_x = len(prev_line)
+            self.lines[self.cursor_y - 1:self.cursor_y + 1] = [
+                prev_line + self.lines[self.cursor_y]
+            ]
             self.cursor_y -= 1
             self.modified = True
             
     def delete_char_at_cursor(self):
         """Delete character at cursor position."""
         self.undo_manager.save_state("Delete at cursor")
-        line = self.lines[self.cursor_y]
+        lines = self.lines
+        y = self.cursor_y
+        x = self.cursor_x
+        line = lines[y]
         
-        if self.cursor_x < len(line):
-            self.lines[self.cursor_y] = (
-                line[:self.cursor_x] + line[self.cursor_x + 1:]
-            )
+        if x < len(line):
+            lines[y] = line[:x] + line[x + 1:]
             self.modified = True
-        elif self.cursor_y < len(self.lines) - 1:
-            # Join with next line
-            self.lines[self.cursor_y] += self.lines[self.cursor_y + 1]
-            del self.lines[self.cursor_y + 1]
+        elif y < len(lines) - 1:
+            # Join with next line in a single splice
+            lines[y:y + 2] = [line + lines[y + 1]]
             self.modified = True
             
     def backspace(self):
@@ -154,13 +268,36 @@ class Buffer:
         self.cursor_x = 0
         self.modified = True
         
+    def split_line(self, y: int, x: int, indent: str = ""):
+        """Split line y at column x, starting the new line with indent."""
+        self.undo_manager.save_state("Split line")
+        line = self.lines[y]
+        if x >= len(line):
+            # Enter at end of line (and o): the line stays as it is, so
+            # only the new one is inserted, with nothing sliced
+            self.lines.insert(y + 1, indent)
+        else:
+            # Replace the line with both halves in one splice
+            self.lines[y:y + 1] = [line[:x], indent + line[x:]]
+        self.cursor_y = y + 1
+        self.cursor_x = len(indent)
+        self.modified = True
+        
+    def insert_lines(self, y: int, new_lines: List[str], description: str = "Insert lines"):
+        """Insert lines before line y in a single splice."""
+        self.undo_manager.save_state(description)
+        self.lines[y:y] = new_lines
+        self.modified = True
+        
     def delete_line(self):
         """Delete current line."""
         self.undo_manager.save_state("Delete line")
-        if len(self.lines) > 1:
-            del self.lines[self.cursor_y]
-            if self.cursor_y >= len(self.lines):
-                self.cursor_y = len(self.lines) - 1
+        lines = self.lines
+        if len(lines) > 1:
+            del lines[self.cursor_y]
+            nlines = len(lines)
+            if self.cursor_y >= nlines:
+                self.cursor_y = nlines - 1
             self.cursor_x = 0
             self.modified = True
         else:
@@ -170,20 +307,27 @@ class Buffer:
             
     def move_cursor(self, dx: int = 0, dy: int = 0):
         """Move cursor by specified offset."""
+        lines = self.lines
+        
         # Vertical movement
-        new_y = self.cursor_y + dy
-        self.cursor_y = max(0, min(new_y, len(self.lines) - 1))
+        nlines = len(lines)
+        y = self.cursor_y + dy
+        y = 0 if y < 0 else (nlines - 1 if y >= nlines else y)
+        self.cursor_y = y
         
         # Horizontal movement
-        line_length = len(self.lines[self.cursor_y])
-        new_x = self.cursor_x + dx
-        self.cursor_x = max(0, min(new_x, line_length))
+        line_length = len(lines[y])
+        x = self.cursor_x + dx
+        self.cursor_x = 0 if x < 0 else (line_length if x > line_length else x)
         
     def move_cursor_to(self, x: int, y: int):
         """Move cursor to absolute position."""
-        self.cursor_y = max(0, min(y, len(self.lines) - 1))
-        line_length = len(self.lines[self.cursor_y])
-        self.cursor_x = max(0, min(x, line_length))
+        lines = self.lines
+        nlines = len(lines)
+        y = 0 if y < 0 else (nlines - 1 if y >= nlines else y)
+        self.cursor_y = y
+        line_length = len(lines[y])
+        self.cursor_x = 0 if x < 0 else (line_length if x > line_length else x)
         
     def get_line(self, line_num: int) -> str:
         """Get line at specified line number."""
@@ -193,12 +337,22 @@ class Buffer:
         
     def get_current_line(self) -> str:
         """Get current line."""
-        return self.get_line(self.cursor_y)
+        # Inlined get_line; called for nearly every key press
+        y = self.cursor_y
+        lines = self.lines
+        return lines[y] if 0 <= y < len(lines) else ""
+        
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the buffer."""
+        return len(self.lines)
         
     def goto_line(self, line_num: int):
         """Go to specified line number (1-indexed)."""
         self.add_jump_position()
-        self.cursor_y = max(0, min(line_num - 1, len(self.lines) - 1))
+        nlines = len(self.lines)
+        y = line_num - 1
+        self.cursor_y = 0 if y < 0 else (nlines - 1 if y >= nlines else y)
         self.cursor_x = 0
         
     def set_mark(self, mark: str):
@@ -219,14 +373,13 @@ class Buffer:
         pos = (self.cursor_y, self.cursor_x)
         
         # Remove any forward jumps
-        if self.jump_index < len(self.jump_list) - 1:
-            self.jump_list = self.jump_list[:self.jump_index + 1]
+        while len(self.jump_list) > self.jump_index + 1:
+            self.jump_list.pop()
             
-        # Add new position if it's different from the last one
+        # Add new position if it's different from the last one; the
+        # deque's maxlen drops the oldest entry once the list is full
         if not self.jump_list or self.jump_list[-1] != pos:
             self.jump_list.append(pos)
-            if len(self.jump_list) > 100:  # Limit jump list size
-                self.jump_list.pop(0)
             self.jump_index = len(self.jump_list) - 1
             
     def jump_backward(self) -> bool:
@@ -250,15 +403,20 @@ class Buffer:
     def validate_cursor(self):
         """Ensure cursor is within valid bounds."""
         # Ensure we have at least one line
-        if not self.lines:
-            self.lines = [""]
+        lines = self.lines
+        if not lines:
+            lines = self.lines = [""]
             
         # Validate vertical position
-        self.cursor_y = max(0, min(self.cursor_y, len(self.lines) - 1))
+        nlines = len(lines)
+        y = self.cursor_y
+        y = 0 if y < 0 else (nlines - 1 if y >= nlines else y)
+        self.cursor_y = y
         
         # Validate horizontal position
-        line_length = len(self.lines[self.cursor_y])
-        self.cursor_x = max(0, min(self.cursor_x, line_length))
+        line_length = len(lines[y])
+        x = self.cursor_x
+        self.cursor_x = 0 if x < 0 else (line_length if x > line_length else x)
         
     def get_word_at_cursor(self) -> str:
         """Get the word under the cursor."""
@@ -267,14 +425,8 @@ class Buffer:
             return ""
             
         # Find word boundaries
-        start = self.cursor_x
-        while start > 0 and (line[start - 1].isalnum() or line[start - 1] == '_'):
-            start -= 1
-            
-        end = self.cursor_x
-        while end < len(line) and (line[end].isalnum() or line[end] == '_'):
-            end += 1
-            
+        start = _word_start(line, self.cursor_x)
+        end = _word_end(line, self.cursor_x)
         return line[start:end]
         
     def find_word_start(self, x: int, y: int) -> int:
@@ -282,20 +434,14 @@ class Buffer:
         if y >= len(self.lines):
             return x
             
-        line = self.lines[y]
-        while x > 0 and (line[x - 1].isalnum() or line[x - 1] == '_'):
-            x -= 1
-        return x
+        return _word_start(self.lines[y], x)
         
     def find_word_end(self, x: int, y: int) -> int:
         """Find the end of a word at given position."""
         if y >= len(self.lines):
             return x
             
-        line = self.lines[y]
-        while x < len(line) and (line[x].isalnum() or line[x] == '_'):
-            x += 1
-        return x
+        return _word_end(self.lines[y], x)
         
     def get_visible_lines(self, start: int, count: int) -> List[str]:
         """Get visible lines for display."""
@@ -318,14 +464,7 @@ class Buffer:
         """Set buffer content from string."""
         self.undo_manager.save_state("Set content")
         
-        # Detect line ending
-        if '\r\n' in content:
-            self.line_ending = '\r\n'
-        elif '\r' in content:
-            self.line_ending = '\r'
-        else:
-            self.line_ending = '\n'
-            
+        self.line_ending = _detect_line_ending(content)
         self.lines = content.split(self.line_ending) if content else [""]
         self.cursor_x = 0
         self.cursor_y = 0
@@ -345,31 +484,23 @@ class Buffer:
         
         lines = text.split('\n')
         current_line = self.get_current_line()
+        before = current_line[:self.cursor_x]
+        after = current_line[self.cursor_x:]
         
         if len(lines) == 1:
             # Single line insert
-            self.lines[self.cursor_y] = (
-                current_line[:self.cursor_x] + text + current_line[self.cursor_x:]
-            )
+            self.lines[self.cursor_y] = before + text + after
             self.cursor_x += len(text)
         else:
-            # Multi-line insert
-            before = current_line[:self.cursor_x]
-            after = current_line[self.cursor_x:]
+            # Multi-line insert: splice every new line in with a single
+            # slice assignment instead of shifting the tail once per line
+            last = lines[-1]
+            lines[0] = before + lines[0]
+            lines[-1] = last + after
+            self.lines[self.cursor_y:self.cursor_y + 1] = lines
             
-            # First line
-            self.lines[self.cursor_y] = before + lines[0]
-            
-            # Middle lines
-            for i, line in enumerate(lines[1:-1], 1):
-                self.lines.insert(self.cursor_y + i, line)
-                
-            # Last line
-            last_line_index = self.cursor_y + len(lines) - 1
-            self.lines.insert(last_line_index, lines[-1] + after)
-            
-            self.cursor_y = last_line_index
-            self.cursor_x = len(lines[-1])
+            self.cursor_y += len(lines) - 1
+            self.cursor_x = len(last)
             
         self.modified = True
         
@@ -386,12 +517,8 @@ class Buffer:
             first_line = self.lines[start_y][:start_x]
             last_line = self.lines[end_y][end_x:]
             
-            # Combine first and last line
-            self.lines[start_y] = first_line + last_line
-            
-            # Delete intermediate lines
-            for _ in range(end_y - start_y):
-                del self.lines[start_y + 1]
+            # Combine first and last line, dropping those in between
+            self.lines[start_y:end_y + 1] = [first_line + last_line]
                 
         self.cursor_y = start_y
         self.cursor_x = start_x
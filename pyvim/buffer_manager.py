@@ -1,17 +1,23 @@
 """Buffer management for multiple files."""
 
-from typing import List, Optional, Dict
+import os
+from collections import deque
+from typing import Deque, List, Optional, Dict
 from .buffer import Buffer
 
 
 class BufferManager:
     """Manages multiple buffers."""
     
+    __slots__ = ('buffers', 'current_index', 'buffer_history',
+                 'unnamed_counter', '_by_filename')
+                 
     def __init__(self):
         self.buffers: List[Buffer] = []
         self.current_index = -1
-        self.buffer_history: List[int] = []
+        self.buffer_history: Deque[int] = deque(maxlen=100)
         self.unnamed_counter = 0
+        self._by_filename: Dict[str, int] = {}  # Real path -> buffer index
         
     def create_buffer(self, filename: Optional[str] = None) -> Buffer:
         """Create a new buffer."""
@@ -27,15 +33,23 @@ class BufferManager:
         self.current_index = len(self.buffers) - 1
         self.buffer_history.append(self.current_index)
         
+        if filename:
+            self._by_filename[os.path.realpath(filename)] = self.current_index
+            
         return buffer
         
     def open_file(self, filename: str) -> Buffer:
         """Open a file in a new buffer or switch to existing."""
         # Check if file is already open
-        for i, buffer in enumerate(self.buffers):
-            if buffer.filename == filename:
-                self.switch_to_buffer(i)
+        key = os.path.realpath(filename)
+        index = self._by_filename.get(key)
+        if index is not None:
+            buffer = self.buffers[index]
+            # The buffer may have been saved under another name since
+            if buffer.filename and os.path.realpath(buffer.filename) == key:
+                self.switch_to_buffer(index)
                 return buffer
+            del self._by_filename[key]
                 
         # Create new buffer for file
         return self.create_buffer(filename)
@@ -51,10 +65,6 @@ class BufferManager:
         if 0 <= index < len(self.buffers):
             self.current_index = index
             self.buffer_history.append(index)
-            
-            # Limit history size
-            if len(self.buffer_history) > 100:
-                self.buffer_history.pop(0)
                 
     def next_buffer(self):
         """Switch to next buffer."""
@@ -85,6 +95,7 @@ class BufferManager:
             
         # Remove buffer
         del self.buffers[index]
+        self.reindex()
         
         # Adjust current index
         if self.buffers:
@@ -95,6 +106,13 @@ class BufferManager:
             
         return True
         
+    def reindex(self):
+        """Rebuild the real path index from the buffers' current filenames."""
+        self._by_filename = {
+            os.path.realpath(b.filename): i
+            for i, b in enumerate(self.buffers) if b.filename
+        }
+        
     def get_buffer_list(self) -> List[str]:
         """Get list of buffer names."""
         names = []
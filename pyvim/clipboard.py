@@ -1,8 +1,13 @@
 """Clipboard management with system integration."""
 
 import os
+import queue
+import string
 import sys
-from typing import List, Optional, Tuple
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
 
 try:
     import pyperclip
@@ -16,59 +21,137 @@ class Register:
     
     def __init__(self, name: str):
         self.name = name
-        self.content: List[str] = []
+        self.content: Tuple[str, ...] = ()
         self.is_line_mode = False
         
-    def set(self, content: List[str], line_mode: bool = False):
+    def set(self, content: Sequence[str], line_mode: bool = False):
         """Set register content."""
-        self.content = content.copy()
+        self.content = tuple(content)
         self.is_line_mode = line_mode
         
     def get(self) -> List[str]:
-        """Get register content."""
-        return self.content.copy()
+        """Get a mutable copy of register content."""
+        return list(self.content)
+        
+    def view(self) -> Tuple[str, ...]:
+        """Get register content without copying; it is immutable."""
+        return self.content
         
     def clear(self):
         """Clear register content."""
-        self.content = []
+        self.content = ()
         self.is_line_mode = False
 
 
+class RegisterMap(dict):
+    """Register table that creates registers on first use; 1-9 form a ring."""
+    
+    # Default, yank, small delete, named a-z, clipboard/selection, last
+    # search/command/insert, current/alternate filename
+    NAMES = frozenset('"0-' + string.ascii_lowercase + '+*/:.%#')
+    NUMBERED = ('1', '2', '3', '4', '5', '6', '7', '8', '9')
+    NUMBERED_INDEX = {name: i for i, name in enumerate(NUMBERED)}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.numbered: Deque[Register] = deque(
+            (Register(name) for name in self.NUMBERED), maxlen=9
+        )
+        
+    def __missing__(self, name: str) -> Register:
+        index = self.NUMBERED_INDEX.get(name)
+        if index is not None:
+            return self.numbered[index]
+        if name in self.NAMES:
+            register = self[name] = Register(name)
+            return register
+        raise KeyError(name)
+        
+    def __contains__(self, name) -> bool:
+        return name in self.NAMES or name in self.NUMBERED_INDEX
+        
+    def push_numbered(self, lines: Sequence[str], line_mode: bool = False):
+        """Store lines in register 1, shifting 1-8 down and dropping 9."""
+        # Recycle register 9 as the new register 1 rather than allocating
+        numbered = self.numbered
+        numbered.rotate(1)
+        numbered[0].set(lines, line_mode)
+
+
 class ClipboardManager:
     """Manages clipboard and registers."""
     
+    # Seconds a system clipboard read is served from cache
+    CLIPBOARD_CACHE_TTL = 0.5
+    # Seconds flush waits at exit for queued clipboard operations
+    CLIPBOARD_FLUSH_TIMEOUT = 1.0
+    
     def __init__(self):
-        self.registers = {
-            '"': Register('"'),  # Default register
-            '0': Register('0'),  # Yank register
-            '1': Register('1'),  # Delete registers
-            '2': Register('2'),
-            '3': Register('3'),
-            '4': Register('4'),
-            '5': Register('5'),
-            '6': Register('6'),
-            '7': Register('7'),
-            '8': Register('8'),
-            '9': Register('9'),
-            '-': Register('-'),  # Small delete register
-            'a': Register('a'),  # Named registers a-z
-            'b': Register('b'),
-            'c': Register('c'),
-            # ... add more as needed
-            '+': Register('+'),  # System clipboard
-            '*': Register('*'),  # Primary selection (X11)
-            '/': Register('/'),  # Last search pattern
-            ':': Register(':'),  # Last command
-            '.': Register('.'),  # Last inserted text
-            '%': Register('%'),  # Current filename
-            '#': Register('#'),  # Alternate filename
-        }
+        # Registers are created on first use by the RegisterMap
+        self.registers = RegisterMap()
         
         self.recording_register = None
-        self.recording_commands = []
+        self.recording_commands: List[int] = []  # Keycodes
+        # Register name -> (register content, keycodes) of decoded macros
+        self.macro_keys: Dict[str, Tuple[Tuple[str, ...], Tuple[int, ...]]] = {}
+        
+        # System clipboard I/O runs on a worker thread, since pyperclip
+        # shells out to xclip/pbpaste and would block the main loop
+        self.clipboard_queue: 'queue.Queue[Tuple[str, object]]' = queue.Queue()
+        self.clipboard_thread: Optional[threading.Thread] = None
+        # (content, time read, (lines, line mode)) of the last clipboard sync
+        self.clipboard_cache: Optional[Tuple[str, float, Tuple[Tuple[str, ...], bool]]] = None
+        self.clipboard_fetching = False
+        
+    def _clipboard_request(self, op: str, payload=None):
+        """Queue a system clipboard operation for the worker thread."""
+        if self.clipboard_thread is None:
+            self.clipboard_thread = threading.Thread(
+                target=self._clipboard_worker, name="pyvim-clipboard", daemon=True
+            )
+            self.clipboard_thread.start()
+        self.clipboard_queue.put((op, payload))
         
-    def yank(self, lines: List[str], register: str = '"', line_mode: bool = False):
+    def _clipboard_worker(self):
+        """Perform queued clipboard copies and pastes, caching the result."""
+        while True:
+            op, payload = self.clipboard_queue.get()
+            if op == 'flush':
+                # Everything queued before the marker has been handled
+                payload.set()
+                continue
+            try:
+                if op == 'copy':
+                    text, parsed = payload
+                    pyperclip.copy(text)
+                else:
+                    # Split here, off the main loop; splitlines also
+                    # handles \r\n from other platforms' clipboards
+                    text = pyperclip.paste()
+                    parsed = (tuple(text.splitlines()), '\n' in text)
+                self.clipboard_cache = (text, time.monotonic(), parsed)
+            except Exception:
+                pass
+            finally:
+                if op == 'paste':
+                    self.clipboard_fetching = False
+                    
+    def flush(self, timeout: Optional[float] = None):
+        """Wait, up to timeout seconds, for queued clipboard operations."""
+        # The worker is a daemon thread, so copies still queued at exit
+        # would otherwise never reach the system clipboard
+        if self.clipboard_thread is None:
+            return
+        if timeout is None:
+            timeout = self.CLIPBOARD_FLUSH_TIMEOUT
+        done = threading.Event()
+        self.clipboard_queue.put(('flush', done))
+        done.wait(timeout)
+        
+    def yank(self, lines: Sequence[str], register: str = '"', line_mode: bool = False):
         """Yank (copy) lines to register."""
+        # One tuple shared by every register set below; free for a tuple
+        lines = tuple(lines)
         if register not in self.registers:
             register = '"'
             
@@ -78,46 +161,47 @@ class ClipboardManager:
         if register != '0':
             self.registers['0'].set(lines, line_mode)
             
-        # Copy to system clipboard if using + register
+        # Copy to system clipboard if using + register, unless it held
+        # this text moments ago; an older cache entry may be out of date,
+        # since other applications can have written the clipboard since
         if register == '+' and HAS_PYPERCLIP:
-            try:
-                pyperclip.copy('\n'.join(lines))
-            except:
-                pass
+            text = '\n'.join(lines)
+            cached = self.clipboard_cache
+            if (cached is None or cached[0] != text or
+                    time.monotonic() - cached[1] >= self.CLIPBOARD_CACHE_TTL):
+                self._clipboard_request('copy', (text, (lines, len(lines) > 1)))
                 
-    def delete(self, lines: List[str], register: str = '"', line_mode: bool = False):
+    def delete(self, lines: Sequence[str], register: str = '"', line_mode: bool = False):
         """Delete lines and save to register."""
+        lines = tuple(lines)
         if register not in self.registers:
             register = '"'
             
-        # Rotate numbered registers
-        for i in range(9, 1, -1):
-            if str(i-1) in self.registers and str(i) in self.registers:
-                self.registers[str(i)].content = self.registers[str(i-1)].content
-                self.registers[str(i)].is_line_mode = self.registers[str(i-1)].is_line_mode
-                
-        # Set register 1
-        self.registers['1'].set(lines, line_mode)
+        # Rotate numbered registers and set register 1
+        self.registers.push_numbered(lines, line_mode)
         
         # Set specified register
         self.registers[register].set(lines, line_mode)
         
-    def put(self, register: str = '"') -> Optional[Tuple[List[str], bool]]:
+    def put(self, register: str = '"') -> Optional[Tuple[Tuple[str, ...], bool]]:
         """Get content from register for pasting."""
         if register == '+' and HAS_PYPERCLIP:
-            # Get from system clipboard
-            try:
-                content = pyperclip.paste()
-                if content:
-                    lines = content.split('\n')
-                    return (lines, '\n' in content)
-            except:
-                pass
+            # Serve the system clipboard from cache, refreshing it in the
+            # background once stale; until the first read completes the
+            # + register holds what was last yanked to it
+            cached = self.clipboard_cache
+            if (cached is None or
+                    time.monotonic() - cached[1] >= self.CLIPBOARD_CACHE_TTL):
+                if not self.clipboard_fetching:
+                    self.clipboard_fetching = True
+                    self._clipboard_request('paste')
+            if cached is not None and cached[0]:
+                return cached[2]
                 
         if register in self.registers:
             reg = self.registers[register]
             if reg.content:
-                return (reg.get(), reg.is_line_mode)
+                return (reg.view(), reg.is_line_mode)
                 
         return None
         
@@ -130,10 +214,15 @@ class ClipboardManager:
     def stop_recording(self):
         """Stop recording macro."""
         if self.recording_register:
-            self.registers[self.recording_register].set(
-                self.recording_commands,
+            # Registers hold text: printable keys as characters, others
+            # as their code. The keycodes are kept for playback as is
+            keys = self.recording_commands
+            register = self.registers[self.recording_register]
+            register.set(
+                [chr(key) if 0 < key < 127 else str(key) for key in keys],
                 line_mode=False
             )
+            self.macro_keys[self.recording_register] = (register.view(), tuple(keys))
             self.recording_register = None
             self.recording_commands = []
             
@@ -141,13 +230,31 @@ class ClipboardManager:
         """Check if currently recording."""
         return self.recording_register is not None
         
-    def record_command(self, command: str):
-        """Record a command during macro recording."""
-        if self.is_recording():
-            self.recording_commands.append(command)
+    def record_command(self, key: int):
+        """Record a keycode during macro recording."""
+        if self.recording_register is not None:
+            self.recording_commands.append(key)
             
-    def play_macro(self, register: str) -> List[str]:
-        """Play back a recorded macro."""
-        if register in self.registers:
-            return self.registers[register].get()
-        return []
\ No newline at end of file
+    def play_macro(self, register: str) -> Tuple[int, ...]:
+        """Get the keycodes of a macro, decoded once per register content."""
+        if register not in self.registers:
+            return ()
+            
+        content = self.registers[register].view()
+        cached = self.macro_keys.get(register)
+        if cached is not None and cached[0] is content:
+            return cached[1]
+            
+        # Printable keys are recorded as characters, others as their code;
+        # any other text (e.g. a yanked line) replays character by character
+        keys = []
+        for command in content:
+            if len(command) == 1:
+                keys.append(ord(command))
+            elif command.lstrip('-').isdigit():
+                keys.append(int(command))
+            else:
+                keys.extend(map(ord, command))
+        keys = tuple(keys)
+        self.macro_keys[register] = (content, keys)
+        return keys
\ No newline at end of file
@@ -1,16 +1,75 @@
 """Enhanced command mode implementation for v0.0.2a."""
 
-from typing import TYPE_CHECKING, Optional, List
-import os
+from typing import TYPE_CHECKING, Optional, List, Tuple
 import re
 
+from .utils import compile_pattern
+
 if TYPE_CHECKING:
     from .editor import Editor
 
 
+# A quoted run (closing quote optional), a bare run, or separating spaces
+_COMMAND_TOKEN_RE = re.compile(r'"([^"]*)"?|\'([^\']*)\'?|([^ "\']+)| +')
+
+
+def _parse_substitute(arg: str) -> Optional[Tuple[str, str, str]]:
+    """Split the argument of :s into pattern, replacement and flags."""
+    parts = arg.split('/', 2)
+    if len(parts) < 2 or not parts[0]:
+        return None
+    return parts[0], parts[1], parts[2] if len(parts) > 2 else ''
+
+
 class CommandProcessor:
     """Enhanced command processor with more vim commands."""
     
+    # :set flag -> (owner attribute on the editor, attribute, value, message)
+    OPTIONS = {
+        'number': ('config', 'show_line_numbers', True, "Line numbers enabled"),
+        'nonumber': ('config', 'show_line_numbers', False, "Line numbers disabled"),
+        'expandtab': ('config', 'use_spaces', True, "Expand tab enabled"),
+        'noexpandtab': ('config', 'use_spaces', False, "Expand tab disabled"),
+        'autoindent': ('config', 'auto_indent', True, "Auto indent enabled"),
+        'noautoindent': ('config', 'auto_indent', False, "Auto indent disabled"),
+        'ignorecase': ('search_engine', 'case_sensitive', False, "Ignore case enabled"),
+        'noignorecase': ('search_engine', 'case_sensitive', True, "Ignore case disabled"),
+    }
+    OPTIONS.update({
+        'nu': OPTIONS['number'], 'nonu': OPTIONS['nonumber'],
+        'et': OPTIONS['expandtab'], 'noet': OPTIONS['noexpandtab'],
+        'ai': OPTIONS['autoindent'], 'noai': OPTIONS['noautoindent'],
+        'ic': OPTIONS['ignorecase'], 'noic': OPTIONS['noignorecase'],
+    })
+    
+    HELP_TEXT = """
+PyVim v0.0.2a - Help
+
+NORMAL MODE:
+  h,j,k,l     - Move cursor
+  i           - Insert mode
+  v           - Visual mode
+  V           - Visual line mode
+  /           - Search forward
+  ?           - Search backward
+  n           - Next match
+  N           - Previous match
+  u           - Undo
+  Ctrl-R      - Redo
+  :           - Command mode
+
+COMMANDS:
+  :w          - Save
+  :q          - Quit
+  :e file     - Edit file
+  :bn/:bp     - Next/previous buffer
+  :split      - Split horizontal
+  :vsplit     - Split vertical
+  :%s/old/new/g - Replace all
+
+Press ENTER to continue...
+"""
+
     def __init__(self, editor: 'Editor'):
         self.editor = editor
         self.commands = {
@@ -60,6 +119,7 @@ class CommandProcessor:
             'mksession': self.make_session,
             'source': self.source_file,
         }
+        self._dispatch = self.commands.get
         
     def execute(self, command: str) -> Optional[str]:
         """Execute a command and return result message."""
@@ -80,38 +140,32 @@ class CommandProcessor:
         args = parts[1:] if len(parts) > 1 else []
         
         # Check for command in dictionary
-        if cmd in self.commands:
-            return self.commands[cmd](args)
+        handler = self._dispatch(cmd)
+        if handler is not None:
+            return handler(args)
         
         # Check for shortcuts
-        if cmd.startswith('s/'):
-            return self.substitute([cmd[2:]])
-        elif cmd.startswith('%s/'):
-            return self.substitute_all([cmd[3:]])
+        if cmd.startswith(('s/', '%s/')):
+            substitute = self.substitute_all if cmd[0] == '%' else self.substitute
+            return substitute([cmd.split('/', 1)[1]])
         else:
             return f"Not an editor command: {cmd}"
             
     def _parse_command(self, command: str) -> List[str]:
         """Parse command line into parts."""
-        # Handle quoted strings
+        # Handle quoted strings a token at a time; quotes are dropped and
+        # adjacent runs glue together until the next unquoted space
         parts = []
         current = ""
-        in_quote = False
-        quote_char = None
         
-        for char in command:
-            if char in ['"', "'"] and not in_quote:
-                in_quote = True
-                quote_char = char
-            elif char == quote_char and in_quote:
-                in_quote = False
-                quote_char = None
-            elif char == ' ' and not in_quote:
+        for match in _COMMAND_TOKEN_RE.finditer(command):
+            group = match.lastindex
+            if group is None:
                 if current:
                     parts.append(current)
                     current = ""
             else:
-                current += char
+                current += match.group(group)
                 
         if current:
             parts.append(current)
@@ -122,9 +176,11 @@ class CommandProcessor:
         """Save the current file."""
         filename = args[0] if args else None
         try:
-            self.editor.buffer.save_file(filename)
+            size = self.editor.buffer.save_file(filename)
+            if filename:
+                # The buffer now answers to its new name
+                self.editor.buffer_manager.reindex()
             lines = len(self.editor.buffer.lines)
-            size = os.path.getsize(self.editor.buffer.filename)
             return f'"{self.editor.buffer.filename}" {lines}L, {size}B written'
         except Exception as e:
             return f"Error: {e}"
@@ -143,9 +199,10 @@ class CommandProcessor:
         self.editor.buffer_manager.open_file(filename)
         self.editor.syntax_highlighter.detect_language(filename)
         
-        if os.path.exists(filename):
+        # The buffer records the size it read, so no stat is needed
+        size = self.editor.buffer.file_size
+        if size is not None:
             lines = len(self.editor.buffer.lines)
-            size = os.path.getsize(filename)
             return f'"{filename}" {lines}L, {size}B'
         else:
             return f'"{filename}" [New File]'
@@ -191,20 +248,17 @@ class CommandProcessor:
             
         # Parse s/pattern/replacement/flags
         pattern_str = args[0]
-        match = re.match(r'([^/]+)/([^/]*)/?(.*)', pattern_str)
+        parsed = _parse_substitute(pattern_str)
         
-        if not match:
+        if not parsed:
             return "E486: Pattern not found"
             
-        pattern, replacement, flags = match.groups()
+        pattern, replacement, flags = parsed
+        regex = compile_pattern(pattern)
         
         # Perform substitution on current line
         line = self.editor.buffer.lines[self.editor.buffer.cursor_y]
-        
-        if 'g' in flags:
-            new_line, count = re.subn(pattern, replacement, line)
-        else:
-            new_line, count = re.subn(pattern, replacement, line, count=1)
+        new_line, count = regex.subn(replacement, line, count=0 if 'g' in flags else 1)
             
         if count > 0:
             self.editor.buffer.undo_manager.save_state("Substitute")
@@ -220,31 +274,28 @@ class CommandProcessor:
             return "E33: No previous substitute regular expression"
             
         pattern_str = args[0]
-        match = re.match(r'([^/]+)/([^/]*)/?(.*)', pattern_str)
+        parsed = _parse_substitute(pattern_str)
         
-        if not match:
+        if not parsed:
             return "E486: Pattern not found"
             
-        pattern, replacement, flags = match.groups()
+        pattern, replacement, flags = parsed
         
-        self.editor.buffer.undo_manager.save_state("Global substitute")
+        # Compile once and hoist the flag test out of the line loop
+        subn = compile_pattern(pattern).subn
+        max_count = 0 if 'g' in flags else 1
+        buffer = self.editor.buffer
         
-        total_count = 0
-        lines_affected = 0
+        # Substitute every line in one pass, then store the result in bulk
+        results = [subn(replacement, line, count=max_count) for line in buffer.lines]
+        counts = [count for _, count in results]
+        total_count = sum(counts)
         
-        for i, line in enumerate(self.editor.buffer.lines):
-            if 'g' in flags:
-                new_line, count = re.subn(pattern, replacement, line)
-            else:
-                new_line, count = re.subn(pattern, replacement, line, count=1)
-                
-            if count > 0:
-                self.editor.buffer.lines[i] = new_line
-                total_count += count
-                lines_affected += 1
-                
         if total_count > 0:
-            self.editor.buffer.modified = True
+            lines_affected = len(counts) - counts.count(0)
+            buffer.undo_manager.save_state("Global substitute")
+            buffer.lines[:] = [new_line for new_line, _ in results]
+            buffer.modified = True
             return f"{total_count} substitution(s) on {lines_affected} line(s)"
         else:
             return "E486: Pattern not found"
@@ -283,73 +334,28 @@ class CommandProcessor:
             
         option = args[0]
         
-        # Parse option
-        if option == "number" or option == "nu":
-            self.editor.config.show_line_numbers = True
-            return "Line numbers enabled"
-        elif option == "nonumber" or option == "nonu":
-            self.editor.config.show_line_numbers = False
-            return "Line numbers disabled"
-        elif option.startswith("tabstop=") or option.startswith("ts="):
-            value = option.split('=')[1]
+        # Boolean options
+        entry = self.OPTIONS.get(option)
+        if entry is not None:
+            owner, attr, value, message = entry
+            setattr(getattr(self.editor, owner), attr, value)
+            return message
+            
+        # Options taking a value
+        name, sep, value = option.partition('=')
+        if sep and name in ('tabstop', 'ts'):
             try:
                 self.editor.config.tab_size = int(value)
                 return f"Tab size set to {value}"
             except ValueError:
                 return "E521: Number required"
-        elif option == "expandtab" or option == "et":
-            self.editor.config.use_spaces = True
-            return "Expand tab enabled"
-        elif option == "noexpandtab" or option == "noet":
-            self.editor.config.use_spaces = False
-            return "Expand tab disabled"
-        elif option == "autoindent" or option == "ai":
-            self.editor.config.auto_indent = True
-            return "Auto indent enabled"
-        elif option == "noautoindent" or option == "noai":
-            self.editor.config.auto_indent = False
-            return "Auto indent disabled"
-        elif option == "ignorecase" or option == "ic":
-            self.editor.search_engine.case_sensitive = False
-            return "Ignore case enabled"
-        elif option == "noignorecase" or option == "noic":
-            self.editor.search_engine.case_sensitive = True
-            return "Ignore case disabled"
-        else:
-            return f"E518: Unknown option: {option}"
+                
+        return f"E518: Unknown option: {option}"
             
     def show_help(self, args: List[str]) -> str:
         """Show help."""
-        help_text = """
-PyVim v0.0.2a - Help
-
-NORMAL MODE:
-  h,j,k,l     - Move cursor
-  i           - Insert mode
-  v           - Visual mode
-  V           - Visual line mode
-  /           - Search forward
-  ?           - Search backward
-  n           - Next match
-  N           - Previous match
-  u           - Undo
-  Ctrl-R      - Redo
-  :           - Command mode
-  
-COMMANDS:
-  :w          - Save
-  :q          - Quit
-  :e file     - Edit file
-  :bn/:bp     - Next/previous buffer
-  :split      - Split horizontal
-  :vsplit     - Split vertical
-  :%s/old/new/g - Replace all
-  
-Press ENTER to continue...
-"""
-        self.editor.display.show_message(help_text)
-        self.editor.display.screen.getch()
-        return ""
+        # Shown by the caller, which waits for a key like any other result
+        return self.HELP_TEXT
         
     def quit(self, args: List[str]) -> str:
         """Quit the editor."""
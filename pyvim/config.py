@@ -2,6 +2,7 @@
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any
 
 
@@ -37,10 +38,16 @@ class Config:
 default_config = Config()
 
 
+@lru_cache(maxsize=1)
+def _default_config_path() -> str:
+    """Return the path of the user's ~/.pyvimrc, resolved once."""
+    return os.path.expanduser("~/.pyvimrc")
+
+
 def load_config(config_path: str = None) -> Config:
     """Load configuration from file."""
     if config_path is None:
-        config_path = os.path.expanduser("~/.pyvimrc")
+        config_path = _default_config_path()
     
     config = Config()
     
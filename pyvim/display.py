@@ -1,22 +1,41 @@
 """Display and UI handling."""
 
 import curses
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List
 
 from pyvim.modes import Mode
 
 if TYPE_CHECKING:
     from .editor import Editor
 
+# Placeholder for a text row that has not been drawn since the last erase()
+_UNDRAWN = object()
+
 
 class Display:
     """Handles terminal display and rendering."""
     
+    # Color pair index and padded label of the status bar mode indicator
+    MODE_COLORS = {
+        Mode.NORMAL: (3, " NORMAL "),
+        Mode.INSERT: (4, " INSERT "),
+        Mode.VISUAL: (5, " VISUAL "),
+        Mode.COMMAND: (1, " COMMAND "),
+    }
+    
     def __init__(self, editor: 'Editor'):
         self.editor = editor
         self.screen = None
         self.height = 0
         self.width = 0
+        self.color_pairs = [0] * 6  # curses.color_pair(n), cached per screen
+        self.color_pairs_bold = [curses.A_BOLD] * 6
+        # Last status bar strings, keyed by the state they were built from
+        self.middle_status = (None, "")
+        self.right_status = (None, "")
+        # What each text row currently shows; see render()
+        self.drawn_layout = None
+        self.drawn_lines: List[object] = []
         
     def init_screen(self):
         """Initialize curses screen."""
@@ -39,6 +58,15 @@ class Display:
             curses.init_pair(4, curses.COLOR_RED, -1)    # Error messages
             curses.init_pair(5, curses.COLOR_CYAN, -1)   # Info messages
             
+        # Resolve the pair attributes once instead of on every frame
+        self.color_pairs = [curses.color_pair(i) for i in range(6)]
+        self.color_pairs_bold = [pair | curses.A_BOLD for pair in self.color_pairs]
+        self.invalidate()
+        
+    def invalidate(self):
+        """Force the next render to redraw every row."""
+        self.drawn_layout = None
+        
     def cleanup_screen(self):
         """Cleanup curses screen."""
         if self.screen:
@@ -47,69 +75,108 @@ class Display:
             curses.echo()
             curses.endwin()
             
+    def poll_key(self) -> int:
+        """Read a key if one is already waiting, else return -1 at once."""
+        screen = self.screen
+        screen.nodelay(True)
+        try:
+            return screen.getch()
+        finally:
+            screen.nodelay(False)
+        
+    def gutter_width(self) -> int:
+        """Width of the line number gutter, sized for the largest visible number."""
+        if not self.editor.config.show_line_numbers:
+            return 0
+        buffer = self.editor.buffer
+        last = min(buffer.offset_y + self.height - 2, len(buffer.lines))
+        return max(4, len(str(last))) + 1
+        
     def render(self):
-        """Render the entire screen."""
+        """Render the screen, redrawing only the text rows that changed."""
         if not self.screen:
             return
             
-        self.screen.clear()
-        
         # Calculate visible area
         visible_height = self.height - 2  # Reserve for status bar and command line
         buffer = self.editor.buffer
         
-        # Render text lines
+        # Hoist everything the per-line loop needs into locals
+        screen = self.screen
+        addstr = screen.addstr
+        addnstr = screen.addnstr
+        width = self.width
+        offset_x = buffer.offset_x
+        offset_y = buffer.offset_y
+        gutter_color = self.color_pairs[2]
+        show_line_numbers = self.editor.config.show_line_numbers
+        visible_lines = buffer.lines[offset_y:offset_y + visible_height]
+        
+        x_offset = self.gutter_width()
+        number_width = x_offset - 1
+        
+        # Anything that moves every row starts a fresh frame. erase() only
+        # blanks the virtual screen, so refresh() still diffs it against
+        # the terminal; clear() would force a full repaint
+        layout = (buffer, offset_y, offset_x, x_offset, self.height, width)
+        if layout != self.drawn_layout:
+            screen.erase()
+            self.drawn_layout = layout
+            self.drawn_lines = [_UNDRAWN] * visible_height
+        drawn = self.drawn_lines
+        
+        # Only rows whose line changed are redrawn. Lines are immutable
+        # strings, so the same object means the same text; None marks a
+        # "~" row past the end of the buffer
         for y in range(visible_height):
-            line_num = y + buffer.offset_y
-            
-            if line_num < len(buffer.lines):
-                # Show line numbers if enabled
-                if self.editor.config.show_line_numbers:
-                    line_num_str = f"{line_num + 1:4} "
-                    try:
-                        self.screen.addstr(y, 0, line_num_str, curses.color_pair(2))
-                    except curses.error:
-                        pass
-                    x_offset = len(line_num_str)
-                else:
-                    x_offset = 0
-                    
-                # Render line content
-                line = buffer.lines[line_num]
-                if buffer.offset_x < len(line):
-                    visible_line = line[buffer.offset_x:buffer.offset_x + self.width - x_offset]
-                    try:
-                        self.screen.addstr(y, x_offset, visible_line)
-                    except curses.error:
-                        pass
-            else:
-                # Empty line indicator
-                try:
-                    self.screen.addstr(y, 0, "~", curses.color_pair(2))
-                except curses.error:
-                    pass
+            line = visible_lines[y] if y < len(visible_lines) else None
+            if drawn[y] is line:
+                continue
+            drawn[y] = line
+            try:
+                screen.move(y, 0)
+                screen.clrtoeol()
+                if line is None:
+                    addstr(y, 0, "~", gutter_color)
+                    continue
+                if show_line_numbers:
+                    addstr(y, 0, f"{offset_y + y + 1:{number_width}} ", gutter_color)
+                # Let addnstr truncate at the right edge
+                if offset_x < len(line):
+                    addnstr(y, x_offset, line[offset_x:] if offset_x else line,
+                            width - x_offset)
+            except curses.error:
+                pass
                 
         # Render status bar
         self.update_status_bar()
         
-        # Show message if any
+        # Show message if any; the refresh below flushes it with the frame
         if self.editor.message:
-            self.show_message(self.editor.message, temporary=False)
+            self.show_message(self.editor.message)
+        else:
+            try:
+                self.screen.move(self.height - 1, 0)
+                self.screen.clrtoeol()
+            except curses.error:
+                pass
         
         # Position cursor
         cursor_screen_y = buffer.cursor_y - buffer.offset_y
-        cursor_screen_x = buffer.cursor_x - buffer.offset_x
+        cursor_screen_x = buffer.cursor_x - buffer.offset_x + x_offset
         
-        if self.editor.config.show_line_numbers:
-            cursor_screen_x += 5
-            
-        # Ensure cursor is within screen bounds
-        if 0 <= cursor_screen_y < visible_height and 0 <= cursor_screen_x < self.width:
-            try:
-                self.screen.move(cursor_screen_y, cursor_screen_x)
-            except curses.error:
-                pass
+        # Clamp the cursor onto the text area so it is always placed, even
+        # while the viewport lags behind a fast scroll
+        y = cursor_screen_y
+        x = cursor_screen_x
+        y = 0 if y < 0 else (visible_height - 1 if y >= visible_height else y)
+        x = 0 if x < 0 else (width - 1 if x >= width else x)
+        try:
+            self.screen.move(y, x)
+        except curses.error:
+            pass
             
+        # Exactly one flush to the terminal per frame
         self.screen.refresh()
         
     def update_status_bar(self):
@@ -121,40 +188,42 @@ class Display:
         mode = self.editor.mode_handler.get_mode()
         
         # Mode indicator with color
-        mode_colors = {
-            Mode.NORMAL: (curses.color_pair(3), "NORMAL"),
-            Mode.INSERT: (curses.color_pair(4), "INSERT"),
-            Mode.VISUAL: (curses.color_pair(5), "VISUAL"),
-            Mode.COMMAND: (curses.color_pair(1), "COMMAND"),
-        }
-        
-        color, mode_text = mode_colors.get(mode, (curses.color_pair(1), mode.name))
-        
-        # Status bar content
-        left_status = f" {mode_text} "
-        if buffer.filename:
-            middle_status = f" {buffer.filename}"
-            if buffer.modified:
-                middle_status += " [+]"
-        else:
-            middle_status = " [No Name]"
+        mode_entry = self.MODE_COLORS.get(mode)
+        if mode_entry is None:
+            mode_entry = (1, f" {Mode.NAMES[mode]} ")
+        pair, left_status = mode_entry
+        status_color = self.color_pairs[1]
+        
+        # Status bar content, rebuilt only when the state behind it changes
+        key = (buffer.filename, buffer.modified)
+        if key != self.middle_status[0]:
+            if buffer.filename:
+                middle_status = f" {buffer.filename}"
+            else:
+                middle_status = " [No Name]"
             if buffer.modified:
                 middle_status += " [+]"
+            self.middle_status = (key, middle_status)
+        middle_status = self.middle_status[1]
             
         # Line and column info
-        total_lines = len(buffer.lines)
-        line_percent = int((buffer.cursor_y + 1) * 100 / total_lines) if total_lines > 0 else 0
-        right_status = f" {buffer.cursor_y + 1},{buffer.cursor_x + 1} | {line_percent}% "
+        total_lines = buffer.line_count
+        key = (buffer.cursor_y, buffer.cursor_x, total_lines)
+        if key != self.right_status[0]:
+            line_percent = int((buffer.cursor_y + 1) * 100 / total_lines) if total_lines > 0 else 0
+            right_status = f" {buffer.cursor_y + 1},{buffer.cursor_x + 1} | {line_percent}% "
+            self.right_status = (key, right_status)
+        right_status = self.right_status[1]
         
         # Draw status bar
         status_y = self.height - 2
         try:
             # Clear status bar line
-            self.screen.addstr(status_y, 0, " " * self.width, curses.color_pair(1))
+            self.screen.addstr(status_y, 0, " " * self.width, status_color)
             # Add status components
-            self.screen.addstr(status_y, 0, left_status, color | curses.A_BOLD)
-            self.screen.addstr(status_y, len(left_status), middle_status, curses.color_pair(1))
-            self.screen.addstr(status_y, self.width - len(right_status), right_status, curses.color_pair(1))
+            self.screen.addstr(status_y, 0, left_status, self.color_pairs_bold[pair])
+            self.screen.addstr(status_y, len(left_status), middle_status, status_color)
+            self.screen.addstr(status_y, self.width - len(right_status), right_status, status_color)
         except curses.error:
             pass
         
@@ -169,12 +238,15 @@ class Display:
             
             # Get user input with basic editing support
             curses.echo()
-            command = self.screen.getstr(command_y, len(prompt), self.width - len(prompt) - 1).decode('utf-8')
-            curses.noecho()
-        except:
-            command = ""
-        
-        return command
+            try:
+                raw = self.screen.getstr(command_y, len(prompt), self.width - len(prompt) - 1)
+            finally:
+                curses.noecho()
+        except (curses.error, KeyboardInterrupt):
+            return ""
+            
+        # Decode once; invalid bytes are replaced instead of dropping the line
+        return raw.decode('utf-8', errors='replace')
         
     def show_message(self, message: str, temporary: bool = True):
         """Display a message in the command line area."""
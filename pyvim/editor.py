@@ -2,7 +2,6 @@
 
 import curses
 import sys
-import os
 import re
 from typing import Optional, List, Tuple
 
@@ -20,6 +19,19 @@ from .clipboard import ClipboardManager
 from .window import Window, WindowManager, WindowLayout
 
 
+# Words are runs of word characters or runs of punctuation, as in vim.
+# Rest of the current word followed by the whitespace after it
+_NEXT_WORD_RE = re.compile(r'(?:\w+|[^\w\s]+)?\s*')
+# Everything up to the last word start; match with endpos=cursor
+_PREV_WORD_RE = re.compile(r'.*(?:\b(?=\w)|(?<![^\w\s])(?=[^\w\s]))')
+
+# Keys that extend a visual selection
+_VISUAL_MOTION_KEYS = frozenset((
+    ord('h'), ord('j'), ord('k'), ord('l'),
+    curses.KEY_LEFT, curses.KEY_DOWN, curses.KEY_UP, curses.KEY_RIGHT,
+))
+
+
 class Editor:
     """Main editor class with enhanced features for v0.0.2a."""
     
@@ -34,6 +46,7 @@ class Editor:
         self.running = False
         self.message = ""
         self.last_command = None
+        self._dirty = True  # Screen needs redrawing
         
         # v0.0.2a features
         self.search_engine = None
@@ -45,7 +58,7 @@ class Editor:
         self.command_history = []
         self.command_history_index = -1
         
-        # Macros
+        # Macros; macro_register is set while recording
         self.macro_register = None
         self.macro_commands = []
         
@@ -95,61 +108,88 @@ class Editor:
                 file_info = self._get_file_info(filename)
                 self.message = f'"{filename}" {file_info}'
                 
+            # Bound once rather than looked up on every keystroke
+            adjust_viewport = self.adjust_viewport
+            render = self.display.render
+            handle_input = self.handle_input
+            poll_key = self.display.poll_key
             while self.running:
-                self.adjust_viewport()
-                self.display.render()
-                self.handle_input()
+                # Keys that changed nothing leave the frame as it is
+                if self._dirty:
+                    self._dirty = False
+                    adjust_viewport()
+                    render()
+                handle_input()
+                # Keys already queued up (a paste, key repeat) are all
+                # handled before drawing the next frame
+                while self.running:
+                    key = poll_key()
+                    if key == -1:
+                        break
+                    handle_input(key)
                 
         finally:
             self.display.cleanup_screen()
+            # Let a "+y just before :q reach the system clipboard
+            self.clipboard_manager.flush()
+            
+    def handle_input(self, key: Optional[int] = None):
+        """Handle user input, reading a key unless one is given."""
+        if key is None:
+            key = self.display.screen.getch()
+        if key == -1:
+            return
             
-    def handle_input(self):
-        """Handle user input."""
-        key = self.display.screen.getch()
-        
-        # Record macro command if recording
-        if self.clipboard_manager.is_recording():
-            self.clipboard_manager.record_command(chr(key) if 0 < key < 127 else str(key))
+        # Record macro key if recording
+        if self.macro_register is not None:
+            self.clipboard_manager.record_command(key)
             
         # Clear message on input
-        if self.message and key != -1:
+        changed = key == curses.KEY_RESIZE
+        if self.message:
             self.message = ""
+            changed = True
             
         # Handle visual mode
         if self.mode_handler.is_visual_mode():
             self.handle_visual_input(key)
-        else:
-            # Let key bindings handle the key
-            if not self.key_bindings.handle_key(key):
-                pass
+            changed = True
+        elif self.key_bindings.handle_key(key):
+            changed = True
+            
+        # A key that no binding took changes nothing on screen
+        if changed:
+            self._dirty = True
                 
     def handle_visual_input(self, key: int):
         """Handle input in visual mode."""
+        visual_handler = self.visual_handler
+        line_mode = visual_handler.is_line_mode
+        
         # Movement updates selection
-        if key in [ord('h'), ord('j'), ord('k'), ord('l'), 
-                   curses.KEY_LEFT, curses.KEY_DOWN, curses.KEY_UP, curses.KEY_RIGHT]:
+        if key in _VISUAL_MOTION_KEYS:
             self.key_bindings.handle_key(key)
-            self.visual_handler.update_selection()
+            visual_handler.update_selection()
             
         # Operations on selection
         elif key == ord('d'):  # Delete selection
-            text = self.visual_handler.get_selected_text()
-            self.clipboard_manager.delete(text.split('\n'), line_mode=self.visual_handler.mode == VisualMode.LINE)
-            self.visual_handler.delete_selection()
+            lines = visual_handler.get_selected_lines()
+            self.clipboard_manager.delete(lines, line_mode=line_mode)
+            visual_handler.delete_selection()
             self.exit_visual_mode()
             
         elif key == ord('y'):  # Yank selection
-            text = self.visual_handler.get_selected_text()
-            self.clipboard_manager.yank(text.split('\n'), line_mode=self.visual_handler.mode == VisualMode.LINE)
+            lines = visual_handler.get_selected_lines()
+            self.clipboard_manager.yank(lines, line_mode=line_mode)
             self.exit_visual_mode()
-            self.message = f"{len(text.split(chr(10)))} lines yanked"
+            self.message = f"{len(lines)} lines yanked"
             
         elif key == ord('>'):  # Indent
-            self.visual_handler.indent_selection(True)
+            visual_handler.indent_selection(True)
             self.exit_visual_mode()
             
         elif key == ord('<'):  # Unindent
-            self.visual_handler.indent_selection(False)
+            visual_handler.indent_selection(False)
             self.exit_visual_mode()
             
         elif key == 27:  # ESC - exit visual mode
@@ -204,14 +244,15 @@ class Editor:
         
     def insert_at_line_start(self):
         """Move to start of line and enter insert mode (I command)."""
-        # Skip leading whitespace
+        # Skip leading whitespace; a blank line keeps the cursor at 0, and
+        # an unindented one needs no lstrip() copy at all
         line = self.buffer.get_current_line()
-        first_non_space = 0
-        for i, char in enumerate(line):
-            if not char.isspace():
-                first_non_space = i
-                break
-        self.buffer.cursor_x = first_non_space
+        x = 0
+        if line[:1].isspace():
+            stripped = line.lstrip()
+            if stripped:
+                x = len(line) - len(stripped)
+        self.buffer.cursor_x = x
         self.enter_insert_mode()
         
     # ============= Character Operations =============
@@ -233,36 +274,29 @@ class Editor:
     def handle_tab(self):
         """Handle tab key in insert mode."""
         if self.config.use_spaces:
-            # Insert spaces instead of tab
-            for _ in range(self.config.tab_size):
-                self.buffer.insert_char(' ')
+            # Insert spaces instead of tab, as one edit
+            self.buffer.insert_str(' ' * self.config.tab_size)
         else:
             self.buffer.insert_char('\t')
             
     def handle_enter(self):
         """Handle enter key in insert mode."""
-        line = self.buffer.get_current_line()
-        # Split current line at cursor
-        before = line[:self.buffer.cursor_x]
-        after = line[self.buffer.cursor_x:]
-        
-        self.buffer.lines[self.buffer.cursor_y] = before
-        self.buffer.lines.insert(self.buffer.cursor_y + 1, after)
-        self.buffer.cursor_y += 1
-        
-        # Auto-indent: match indentation of previous line
-        if self.config.auto_indent:
-            indent_match = re.match(r'^(\s*)', before)
-            if indent_match:
-                indent = indent_match.group(1)
-                self.buffer.lines[self.buffer.cursor_y] = indent + self.buffer.lines[self.buffer.cursor_y]
-                self.buffer.cursor_x = len(indent)
-            else:
-                self.buffer.cursor_x = 0
-        else:
-            self.buffer.cursor_x = 0
+        buffer = self.buffer
+        line = buffer.get_current_line()
+        x = buffer.cursor_x
+        
+        # Auto-indent: match indentation of previous line; lstrip finds
+        # the end of the leading whitespace in C, with no match object,
+        # and is skipped outright when the line is not indented. The
+        # indent is cut from the line itself, never from a copy of the
+        # text before the cursor
+        indent = ""
+        if self.config.auto_indent and line[:1].isspace():
+            end = len(line) - len(line.lstrip())
+            indent = line[:end if end < x else x]
             
-        self.buffer.modified = True
+        # Split current line at cursor
+        buffer.split_line(buffer.cursor_y, x, indent)
         
     # ============= Navigation =============
     
@@ -281,7 +315,7 @@ class Editor:
         
     def goto_last_line(self):
         """Go to last line (G command)."""
-        self.buffer.cursor_y = len(self.buffer.lines) - 1
+        self.buffer.cursor_y = self.buffer.line_count - 1
         self.buffer.cursor_x = 0
         
     def next_word(self):
@@ -289,16 +323,13 @@ class Editor:
         line = self.buffer.get_current_line()
         x = self.buffer.cursor_x
         
-        # Skip current word
-        while x < len(line) and line[x].isalnum():
-            x += 1
-        # Skip spaces
-        while x < len(line) and not line[x].isalnum():
-            x += 1
+        # Skip the current word and the whitespace after it in one match
+        if x < len(line):
+            x = _NEXT_WORD_RE.match(line, x).end()
             
         if x < len(line):
             self.buffer.cursor_x = x
-        elif self.buffer.cursor_y < len(self.buffer.lines) - 1:
+        elif self.buffer.cursor_y < self.buffer.line_count - 1:
             self.buffer.cursor_y += 1
             self.buffer.cursor_x = 0
             
@@ -308,14 +339,10 @@ class Editor:
         x = self.buffer.cursor_x
         
         if x > 0:
-            x -= 1
-            # Skip spaces
-            while x > 0 and not line[x].isalnum():
-                x -= 1
-            # Skip to beginning of word
-            while x > 0 and line[x-1].isalnum():
-                x -= 1
-            self.buffer.cursor_x = x
+            # Start of the last word before the cursor, found without
+            # copying or reversing the line
+            match = _PREV_WORD_RE.match(line, 0, x)
+            self.buffer.cursor_x = match.end() if match else 0
         elif self.buffer.cursor_y > 0:
             self.buffer.cursor_y -= 1
             self.goto_line_end()
@@ -351,90 +378,71 @@ class Editor:
         """Handle 'd' command (dd for delete line, dw for delete word, etc.)."""
         key = self.display.screen.getch()
         
+        buffer = self.buffer
+        x = buffer.cursor_x
+        line = buffer.get_current_line()
+        
         if key == ord('d'):
-            # dd - delete line
-            self.buffer.undo_manager.save_state("Delete line")
-            line = self.buffer.get_current_line()
-            self.clipboard_manager.delete([line], '"', line_mode=True)
-            self.buffer.delete_line()
+            # dd - delete line; delete_line records the undo state itself
+            self.clipboard_manager.delete((line,), '"', line_mode=True)
+            buffer.delete_line()
             self.message = "1 line deleted"
             
         elif key == ord('w'):
-            # dw - delete word
-            self.buffer.undo_manager.save_state("Delete word")
-            start_x = self.buffer.cursor_x
-            self.next_word()
-            end_x = self.buffer.cursor_x
-            
-            line = self.buffer.get_current_line()
-            deleted = line[start_x:end_x]
-            self.buffer.lines[self.buffer.cursor_y] = line[:start_x] + line[end_x:]
-            self.buffer.cursor_x = start_x
-            self.buffer.modified = True
-            self.clipboard_manager.delete([deleted], '"')
-            self.message = "Word deleted"
-            
+            # dw - delete word, up to the end of the line at most
+            end_x = _NEXT_WORD_RE.match(line, x).end() if x < len(line) else x
+            if end_x > x:
+                buffer.undo_manager.save_state("Delete word")
+                buffer.lines[buffer.cursor_y] = line[:x] + line[end_x:]
+                buffer.modified = True
+                self.clipboard_manager.delete((line[x:end_x],), '"')
+                self.message = "Word deleted"
+                
         elif key == ord('0'):
             # d0 - delete to beginning of line
-            self.buffer.undo_manager.save_state("Delete to line start")
-            line = self.buffer.get_current_line()
-            deleted = line[:self.buffer.cursor_x]
-            self.buffer.lines[self.buffer.cursor_y] = line[self.buffer.cursor_x:]
-            self.buffer.cursor_x = 0
-            self.buffer.modified = True
-            self.clipboard_manager.delete([deleted], '"')
-            
+            if x > 0:
+                buffer.undo_manager.save_state("Delete to line start")
+                buffer.lines[buffer.cursor_y] = line[x:]
+                buffer.cursor_x = 0
+                buffer.modified = True
+                self.clipboard_manager.delete((line[:x],), '"')
+                
         elif key == ord('$'):
             # d$ - delete to end of line
-            self.buffer.undo_manager.save_state("Delete to line end")
-            line = self.buffer.get_current_line()
-            deleted = line[self.buffer.cursor_x:]
-            self.buffer.lines[self.buffer.cursor_y] = line[:self.buffer.cursor_x]
-            if self.buffer.cursor_x > 0:
-                self.buffer.cursor_x -= 1
-            self.buffer.modified = True
-            self.clipboard_manager.delete([deleted], '"')
-            
+            if x < len(line):
+                buffer.undo_manager.save_state("Delete to line end")
+                buffer.lines[buffer.cursor_y] = line[:x]
+                if x > 0:
+                    buffer.cursor_x = x - 1
+                buffer.modified = True
+                self.clipboard_manager.delete((line[x:],), '"')
+                
     def handle_y_command(self):
         """Handle 'y' command (yy for yank line, yw for yank word, etc.)."""
         key = self.display.screen.getch()
         
+        x = self.buffer.cursor_x
+        line = self.buffer.get_current_line()
+        
         if key == ord('y'):
             # yy - yank line
-            line = self.buffer.get_current_line()
-            self.clipboard_manager.yank([line], '"', line_mode=True)
+            self.clipboard_manager.yank((line,), '"', line_mode=True)
             self.message = "1 line yanked"
             
         elif key == ord('w'):
-            # yw - yank word
-            start_x = self.buffer.cursor_x
-            old_y = self.buffer.cursor_y
-            self.next_word()
-            end_x = self.buffer.cursor_x
-            
-            if self.buffer.cursor_y == old_y:
-                line = self.buffer.get_current_line()
-                yanked = line[start_x:end_x]
-                self.clipboard_manager.yank([yanked], '"')
-                self.buffer.cursor_x = start_x  # Return cursor to original position
-                self.message = "Word yanked"
-            else:
-                # Word spans multiple lines
-                self.buffer.cursor_y = old_y
-                self.buffer.cursor_x = start_x
-                
+            # yw - yank word, up to the end of the line at most
+            end_x = _NEXT_WORD_RE.match(line, x).end() if x < len(line) else x
+            self.clipboard_manager.yank((line[x:end_x],), '"')
+            self.message = "Word yanked"
+            
         elif key == ord('0'):
             # y0 - yank to beginning of line
-            line = self.buffer.get_current_line()
-            yanked = line[:self.buffer.cursor_x]
-            self.clipboard_manager.yank([yanked], '"')
+            self.clipboard_manager.yank((line[:x],), '"')
             self.message = "Yanked to line start"
             
         elif key == ord('$'):
             # y$ - yank to end of line
-            line = self.buffer.get_current_line()
-            yanked = line[self.buffer.cursor_x:]
-            self.clipboard_manager.yank([yanked], '"')
+            self.clipboard_manager.yank((line[x:],), '"')
             self.message = "Yanked to line end"
             
     # ============= Paste Operations =============
@@ -444,26 +452,21 @@ class Editor:
         result = self.clipboard_manager.put('"')
         if result:
             lines, line_mode = result
-            self.buffer.undo_manager.save_state("Paste")
+            buffer = self.buffer
+            y = buffer.cursor_y
             
             if line_mode:
                 # Paste lines after current line
-                for i, line in enumerate(lines):
-                    self.buffer.lines.insert(self.buffer.cursor_y + i + 1, line)
-                self.buffer.cursor_y += 1
-                self.buffer.cursor_x = 0
+                buffer.insert_lines(y + 1, lines, "Paste")
+                buffer.cursor_y = y + 1
+                buffer.cursor_x = 0
             else:
                 # Paste at cursor position
-                current_line = self.buffer.get_current_line()
-                text = ''.join(lines)
-                self.buffer.lines[self.buffer.cursor_y] = (
-                    current_line[:self.buffer.cursor_x + 1] + 
-                    text + 
-                    current_line[self.buffer.cursor_x + 1:]
-                )
-                self.buffer.cursor_x += len(text)
+                self._paste_chars(buffer.cursor_x + 1, lines, "Paste")
+                if len(lines) == 1:
+                    buffer.cursor_x += len(lines[0])
                 
-            self.buffer.modified = True
+            buffer.modified = True
             self.message = f"{len(lines)} line(s) pasted"
         else:
             self.message = "Nothing to paste"
@@ -473,28 +476,35 @@ class Editor:
         result = self.clipboard_manager.put('"')
         if result:
             lines, line_mode = result
-            self.buffer.undo_manager.save_state("Paste before")
+            buffer = self.buffer
+            y = buffer.cursor_y
             
             if line_mode:
                 # Paste lines before current line
-                for i, line in enumerate(lines):
-                    self.buffer.lines.insert(self.buffer.cursor_y + i, line)
-                self.buffer.cursor_x = 0
+                buffer.insert_lines(y, lines, "Paste before")
+                buffer.cursor_x = 0
             else:
                 # Paste before cursor position
-                current_line = self.buffer.get_current_line()
-                text = ''.join(lines)
-                self.buffer.lines[self.buffer.cursor_y] = (
-                    current_line[:self.buffer.cursor_x] + 
-                    text + 
-                    current_line[self.buffer.cursor_x:]
-                )
+                self._paste_chars(buffer.cursor_x, lines, "Paste before")
                 
-            self.buffer.modified = True
+            buffer.modified = True
             self.message = f"{len(lines)} line(s) pasted"
         else:
             self.message = "Nothing to paste"
             
+    def _paste_chars(self, x: int, lines, description: str):
+        """Splice character-wise register text into the current line at x."""
+        buffer = self.buffer
+        y = buffer.cursor_y
+        buffer.undo_manager.save_state(description)
+        line = buffer.get_current_line()
+        if len(lines) == 1:
+            buffer.lines[y] = line[:x] + lines[0] + line[x:]
+        else:
+            # Text spanning lines splits the current one around it, in a
+            # single splice of the line list
+            buffer.lines[y:y + 1] = [line[:x] + lines[0], *lines[1:-1], lines[-1] + line[x:]]
+            
     # ============= Visual Mode =============
     
     def enter_visual_mode(self, mode: VisualMode = VisualMode.CHARACTER):
@@ -623,6 +633,7 @@ class Editor:
         if key > 0 and chr(key).isalpha():
             register = chr(key).lower()
             self.clipboard_manager.start_recording(register)
+            self.macro_register = self.clipboard_manager.recording_register
             self.message = f"Recording @{register}"
             
     def stop_recording_macro(self):
@@ -630,6 +641,7 @@ class Editor:
         if self.clipboard_manager.is_recording():
             register = self.clipboard_manager.recording_register
             self.clipboard_manager.stop_recording()
+            self.macro_register = None
             self.message = f"Recorded macro @{register}"
             
     def play_macro(self):
@@ -637,14 +649,13 @@ class Editor:
         key = self.display.screen.getch()
         if key > 0 and chr(key).isalpha():
             register = chr(key).lower()
-            commands = self.clipboard_manager.play_macro(register)
-            
-            # Execute macro commands
-            for cmd in commands:
-                if cmd.isdigit():
-                    self.key_bindings.handle_key(int(cmd))
-                else:
-                    self.key_bindings.handle_key(ord(cmd))
+            keys = self.clipboard_manager.play_macro(register)
+            
+            # Execute macro keys as a single undo step
+            handle_key = self.key_bindings.handle_key
+            with self.buffer.batch_edit(f"Macro @{register}"):
+                for key in keys:
+                    handle_key(key)
                     
             self.message = f"Executed macro @{register}"
             
@@ -684,32 +695,36 @@ class Editor:
     
     def adjust_viewport(self):
         """Adjust viewport to keep cursor visible."""
-        if not self.display.screen:
+        display = self.display
+        if not display.screen:
             return
-            
-        visible_height = self.display.height - 2
+        buffer = self.buffer
+        cursor_y = buffer.cursor_y
+        cursor_x = buffer.cursor_x
+        
+        visible_height = display.height - 2
         
-        # Vertical adjustment
-        if self.buffer.cursor_y < self.buffer.offset_y:
-            self.buffer.offset_y = self.buffer.cursor_y
-        elif self.buffer.cursor_y >= self.buffer.offset_y + visible_height:
-            self.buffer.offset_y = self.buffer.cursor_y - visible_height + 1
+        # Vertical adjustment; offsets are only written when they move
+        offset_y = buffer.offset_y
+        if cursor_y < offset_y:
+            buffer.offset_y = cursor_y
+        elif cursor_y >= offset_y + visible_height:
+            buffer.offset_y = cursor_y - visible_height + 1
             
         # Horizontal adjustment
-        visible_width = self.display.width
-        if self.config.show_line_numbers:
-            visible_width -= 5
-            
-        if self.buffer.cursor_x < self.buffer.offset_x:
-            self.buffer.offset_x = self.buffer.cursor_x
-        elif self.buffer.cursor_x >= self.buffer.offset_x + visible_width:
-            self.buffer.offset_x = self.buffer.cursor_x - visible_width + 1
+        visible_width = display.width - display.gutter_width()
+        
+        offset_x = buffer.offset_x
+        if cursor_x < offset_x:
+            buffer.offset_x = cursor_x
+        elif cursor_x >= offset_x + visible_width:
+            buffer.offset_x = cursor_x - visible_width + 1
             
     def _get_file_info(self, filename: str) -> str:
         """Get file information string."""
-        if os.path.exists(filename):
-            size = os.path.getsize(filename)
-            lines = len(self.buffer.lines)
+        size = self.buffer.file_size
+        if size is not None:
+            lines = self.buffer.line_count
             return f"{lines}L, {size}B"
         else:
             return "[New File]"
\ No newline at end of file
@@ -2,7 +2,10 @@
 
 import curses
 import curses.ascii
-from typing import Dict, Callable, TYPE_CHECKING
+from functools import partial
+from typing import Callable, List, Optional, TYPE_CHECKING
+
+from .modes import Mode
 
 if TYPE_CHECKING:
     from .editor import Editor
@@ -11,15 +14,25 @@ if TYPE_CHECKING:
 class KeyBindings:
     """Manages key bindings for different modes."""
     
+    # Binding tables are indexed directly by key code; every curses KEY_*
+    # code fits below this
+    TABLE_SIZE = 512
+    
     def __init__(self, editor: 'Editor'):
         self.editor = editor
-        self.normal_bindings: Dict[int, Callable] = {}
-        self.insert_bindings: Dict[int, Callable] = {}
-        self.command_bindings: Dict[int, Callable] = {}
+        self.mode_handler = editor.mode_handler
+        self.normal_bindings: List[Optional[Callable]] = [None] * self.TABLE_SIZE
+        self.insert_bindings: List[Optional[Callable]] = [None] * self.TABLE_SIZE
+        self.command_bindings: List[Optional[Callable]] = [None] * self.TABLE_SIZE
         
         self._init_normal_bindings()
         self._init_insert_bindings()
         
+        # Binding table of each mode, indexed by its Mode constant
+        self.mode_tables: List[Optional[List[Optional[Callable]]]] = [None] * len(Mode.NAMES)
+        self.mode_tables[Mode.NORMAL] = self.normal_bindings
+        self.mode_tables[Mode.INSERT] = self.insert_bindings
+        
     def _init_normal_bindings(self):
         """Initialize normal mode key bindings."""
         # Movement
@@ -35,60 +48,60 @@ class KeyBindings:
         self.normal_bindings[curses.KEY_RIGHT] = lambda: self.editor.buffer.move_cursor(dx=1)
         
         # Mode changes
-        self.normal_bindings[ord('i')] = lambda: self.editor.enter_insert_mode()
-        self.normal_bindings[ord('a')] = lambda: self.editor.enter_insert_mode(append=True)
-        self.normal_bindings[ord('o')] = lambda: self.editor.open_line_below()
-        self.normal_bindings[ord('O')] = lambda: self.editor.open_line_above()
-        self.normal_bindings[ord('A')] = lambda: self.editor.append_at_line_end()
-        self.normal_bindings[ord('I')] = lambda: self.editor.insert_at_line_start()
+        self.normal_bindings[ord('i')] = self.editor.enter_insert_mode
+        self.normal_bindings[ord('a')] = partial(self.editor.enter_insert_mode, append=True)
+        self.normal_bindings[ord('o')] = self.editor.open_line_below
+        self.normal_bindings[ord('O')] = self.editor.open_line_above
+        self.normal_bindings[ord('A')] = self.editor.append_at_line_end
+        self.normal_bindings[ord('I')] = self.editor.insert_at_line_start
         
         # Editing in normal mode
-        self.normal_bindings[ord('x')] = lambda: self.editor.delete_char_under_cursor()
-        self.normal_bindings[ord('X')] = lambda: self.editor.backspace_in_normal_mode()
-        self.normal_bindings[curses.KEY_DC] = lambda: self.editor.delete_char_under_cursor()  # Delete key
+        self.normal_bindings[ord('x')] = self.editor.delete_char_under_cursor
+        self.normal_bindings[ord('X')] = self.editor.backspace_in_normal_mode
+        self.normal_bindings[curses.KEY_DC] = self.editor.delete_char_under_cursor  # Delete key
         
         # Command mode
-        self.normal_bindings[ord(':')] = lambda: self.editor.enter_command_mode()
+        self.normal_bindings[ord(':')] = self.editor.enter_command_mode
         
         # Navigation
-        self.normal_bindings[ord('0')] = lambda: self.editor.goto_line_start()
-        self.normal_bindings[ord('$')] = lambda: self.editor.goto_line_end()
+        self.normal_bindings[ord('0')] = self.editor.goto_line_start
+        self.normal_bindings[ord('$')] = self.editor.goto_line_end
         self.normal_bindings[ord('g')] = self.editor.handle_g_command
-        self.normal_bindings[ord('G')] = lambda: self.editor.goto_last_line()
+        self.normal_bindings[ord('G')] = self.editor.goto_last_line
         
         # Word navigation
-        self.normal_bindings[ord('w')] = lambda: self.editor.next_word()
-        self.normal_bindings[ord('b')] = lambda: self.editor.prev_word()
+        self.normal_bindings[ord('w')] = self.editor.next_word
+        self.normal_bindings[ord('b')] = self.editor.prev_word
         
         # Line operations
         self.normal_bindings[ord('d')] = self.editor.handle_d_command
         self.normal_bindings[ord('y')] = self.editor.handle_y_command
-        self.normal_bindings[ord('p')] = lambda: self.editor.paste_after()
-        self.normal_bindings[ord('P')] = lambda: self.editor.paste_before()
+        self.normal_bindings[ord('p')] = self.editor.paste_after
+        self.normal_bindings[ord('P')] = self.editor.paste_before
         
     def _init_insert_bindings(self):
         """Initialize insert mode key bindings."""
         # Exit insert mode
-        self.insert_bindings[27] = lambda: self.editor.exit_insert_mode()  # ESC
-        self.insert_bindings[curses.ascii.ESC] = lambda: self.editor.exit_insert_mode()
+        self.insert_bindings[27] = self.editor.exit_insert_mode  # ESC
+        self.insert_bindings[curses.ascii.ESC] = self.editor.exit_insert_mode
         
         # Backspace handling - multiple key codes for compatibility
-        self.insert_bindings[curses.KEY_BACKSPACE] = lambda: self.editor.handle_backspace()
-        self.insert_bindings[127] = lambda: self.editor.handle_backspace()  # ASCII DEL (common backspace)
-        self.insert_bindings[8] = lambda: self.editor.handle_backspace()    # ASCII BS (Ctrl+H)
-        self.insert_bindings[curses.ascii.BS] = lambda: self.editor.handle_backspace()
+        self.insert_bindings[curses.KEY_BACKSPACE] = self.editor.handle_backspace
+        self.insert_bindings[127] = self.editor.handle_backspace  # ASCII DEL (common backspace)
+        self.insert_bindings[8] = self.editor.handle_backspace    # ASCII BS (Ctrl+H)
+        self.insert_bindings[curses.ascii.BS] = self.editor.handle_backspace
         
         # Delete key
         self.insert_bindings[curses.KEY_DC] = lambda: self.editor.buffer.delete_forward()
         
         # Enter/Return
-        self.insert_bindings[10] = lambda: self.editor.handle_enter()  # LF (Line Feed)
-        self.insert_bindings[13] = lambda: self.editor.handle_enter()  # CR (Carriage Return)
-        self.insert_bindings[curses.KEY_ENTER] = lambda: self.editor.handle_enter()
+        self.insert_bindings[10] = self.editor.handle_enter  # LF (Line Feed)
+        self.insert_bindings[13] = self.editor.handle_enter  # CR (Carriage Return)
+        self.insert_bindings[curses.KEY_ENTER] = self.editor.handle_enter
         
         # Tab
-        self.insert_bindings[9] = lambda: self.editor.handle_tab()  # TAB
-        self.insert_bindings[curses.ascii.TAB] = lambda: self.editor.handle_tab()
+        self.insert_bindings[9] = self.editor.handle_tab  # TAB
+        self.insert_bindings[curses.ascii.TAB] = self.editor.handle_tab
         
         # Arrow keys in insert mode
         self.insert_bindings[curses.KEY_LEFT] = lambda: self.editor.buffer.move_cursor(dx=-1)
@@ -97,39 +110,33 @@ class KeyBindings:
         self.insert_bindings[curses.KEY_DOWN] = lambda: self.editor.buffer.move_cursor(dy=1)
         
         # Page navigation
-        self.insert_bindings[curses.KEY_PPAGE] = lambda: self.editor.page_up()
-        self.insert_bindings[curses.KEY_NPAGE] = lambda: self.editor.page_down()
+        self.insert_bindings[curses.KEY_PPAGE] = self.editor.page_up
+        self.insert_bindings[curses.KEY_NPAGE] = self.editor.page_down
         
         # Home/End keys
-        self.insert_bindings[curses.KEY_HOME] = lambda: self.editor.goto_line_start()
-        self.insert_bindings[curses.KEY_END] = lambda: self.editor.goto_line_end()
+        self.insert_bindings[curses.KEY_HOME] = self.editor.goto_line_start
+        self.insert_bindings[curses.KEY_END] = self.editor.goto_line_end
         
     def handle_key(self, key: int) -> bool:
         """Handle key press based on current mode."""
-        from .modes import Mode
-        
-        mode = self.editor.mode_handler.get_mode()
-        
-        if mode == Mode.NORMAL:
-            if key in self.normal_bindings:
-                self.normal_bindings[key]()
+        mode = self.mode_handler.current_mode
+        
+        # Typing is the hot path: no insert binding is printable ASCII,
+        # so it skips the table lookup altogether
+        if mode == Mode.INSERT and 32 <= key < 127:
+            self.editor.buffer.insert_char(chr(key))
+            return True
+            
+        table = self.mode_tables[mode]
+        if table is not None and 0 <= key < self.TABLE_SIZE:
+            action = table[key]
+            if action is not None:
+                action()
                 return True
                 
-        elif mode == Mode.INSERT:
-            if key in self.insert_bindings:
-                self.insert_bindings[key]()
-                return True
-            else:
-                # Regular character input
-                if 32 <= key <= 126:  # Printable ASCII
-                    self.editor.buffer.insert_char(chr(key))
-                    return True
-                # Extended ASCII or Unicode
-                elif key > 126 and key < 256:
-                    try:
-                        self.editor.buffer.insert_char(chr(key))
-                        return True
-                    except:
-                        pass
-                        
-        return False
\ No newline at end of file
+        # Remaining Latin-1 input; 127 (DEL) is bound to backspace above
+        if mode == Mode.INSERT and 127 < key < 256:
+            self.editor.buffer.insert_char(chr(key))
+            return True
+            
+        return False
@@ -1,19 +1,20 @@
 """Editor modes implementation."""
 
-from enum import Enum, auto
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .editor import Editor
 
 
-class Mode(Enum):
-    """Editor modes."""
-    NORMAL = auto()
-    INSERT = auto()
-    VISUAL = auto()
-    COMMAND = auto()
-    REPLACE = auto()
+class Mode:
+    """Editor modes, as plain ints so the per-key mode checks stay cheap."""
+    NORMAL = 0
+    INSERT = 1
+    VISUAL = 2
+    COMMAND = 3
+    REPLACE = 4
+    
+    NAMES = ('NORMAL', 'INSERT', 'VISUAL', 'COMMAND', 'REPLACE')
 
 
 class ModeHandler:
@@ -24,13 +25,15 @@ class ModeHandler:
         self.current_mode = Mode.NORMAL
         self.previous_mode = Mode.NORMAL
         
-    def set_mode(self, mode: Mode):
+    def set_mode(self, mode: int):
         """Change editor mode."""
+        if mode == self.current_mode:
+            return
         self.previous_mode = self.current_mode
         self.current_mode = mode
         self.editor.display.update_status_bar()
         
-    def get_mode(self) -> Mode:
+    def get_mode(self) -> int:
         """Get current mode."""
         return self.current_mode
         
@@ -1,7 +1,12 @@
 """Search and replace functionality."""
 
 import re
-from typing import Optional, Tuple, List
+from bisect import bisect_left, bisect_right
+from collections import deque
+from functools import lru_cache, partial
+from itertools import accumulate, chain
+from operator import methodcaller
+from typing import Deque, Optional, Pattern, Set, Tuple, List
 from dataclasses import dataclass
 
 
@@ -14,17 +19,48 @@ class SearchMatch:
     text: str
 
 
+@lru_cache(maxsize=64)
+def _compile_search(pattern: str, use_regex: bool, whole_word: bool,
+                    case_sensitive: bool) -> Pattern:
+    """Compile a search pattern for the given options; raises re.error."""
+    if not use_regex:
+        pattern = re.escape(pattern)
+        if whole_word:
+            pattern = r'\b' + pattern + r'\b'
+    return re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+
+
+def _find_all(line: str, needle: str) -> List[int]:
+    """Start of every non-overlapping occurrence of needle in line."""
+    starts = []
+    size = len(needle)
+    pos = line.find(needle)
+    while pos != -1:
+        starts.append(pos)
+        pos = line.find(needle, pos + size)
+    return starts
+
+
 class SearchEngine:
     """Handles search and replace operations."""
     
+    SEARCH_HISTORY_SIZE = 50
+    REPLACE_HISTORY_SIZE = 20
+    
     def __init__(self, buffer):
         self.buffer = buffer
         self.last_search: Optional[str] = None
         self.last_direction: str = "forward"
-        self.search_history: List[str] = []
-        self.replace_history: List[Tuple[str, str]] = []
+        self.search_history: Deque[str] = deque(maxlen=self.SEARCH_HISTORY_SIZE)
+        self._search_history_set: Set[str] = set()  # Membership of search_history
+        self.replace_history: Deque[Tuple[str, str]] = deque(maxlen=self.REPLACE_HISTORY_SIZE)
         self.matches: List[SearchMatch] = []
         self.current_match_index: int = -1
+        # The full match list is only collected once n/N needs it
+        self.regex: Optional[Pattern] = None
+        self.regex_options: Tuple[str, bool, bool, bool] = ("", False, False, False)
+        self.current_match: Optional[Tuple[int, int]] = None
+        self.matches_pending = False
         self.case_sensitive: bool = False
         self.use_regex: bool = False
         self.whole_word: bool = False
@@ -42,73 +78,140 @@ class SearchEngine:
         self.last_direction = direction
         
         # Add to search history
-        if pattern not in self.search_history:
-            self.search_history.append(pattern)
-            if len(self.search_history) > 50:
-                self.search_history.pop(0)
-                
-        # Build regex pattern
-        if self.use_regex:
-            try:
-                regex = re.compile(pattern, 
-                                   re.IGNORECASE if not self.case_sensitive else 0)
-            except re.error:
-                return None
-        else:
-            escaped = re.escape(pattern)
-            if self.whole_word:
-                escaped = r'\b' + escaped + r'\b'
-            regex = re.compile(escaped,
-                               re.IGNORECASE if not self.case_sensitive else 0)
-            
-        # Find all matches
-        self.matches.clear()
-        for line_num, line in enumerate(self.buffer.lines):
-            for match in regex.finditer(line):
-                self.matches.append(SearchMatch(
-                    line=line_num,
-                    start=match.start(),
-                    end=match.end(),
-                    text=match.group()
-                ))
+        history = self.search_history
+        if pattern not in self._search_history_set:
+            # The deque drops its oldest entry when full; forget it here too
+            if len(history) == history.maxlen:
+                self._search_history_set.discard(history[0])
+            history.append(pattern)
+            self._search_history_set.add(pattern)
                 
-        if not self.matches:
+        # Build regex pattern, escaped and compiled once per option set
+        try:
+            regex = _compile_search(pattern, self.use_regex, self.whole_word,
+                                    self.case_sensitive)
+        except re.error:
             return None
-            
-        # Find closest match to cursor
+        self.buffer.last_search = regex
+        self.regex = regex
+        self.regex_options = (pattern, self.use_regex, self.whole_word, self.case_sensitive)
+        self.matches.clear()
+        self.matches_pending = True
+        self.current_match_index = -1
+        
+        # Only the match the cursor moves to is looked for here
+        lines = self.buffer.lines
+        forward = direction == "forward"
         if from_cursor:
-            cursor_y, cursor_x = self.buffer.cursor_y, self.buffer.cursor_x
-            
-            if direction == "forward":
-                for i, match in enumerate(self.matches):
-                    if (match.line > cursor_y or 
-                        (match.line == cursor_y and match.start > cursor_x)):
-                        self.current_match_index = i
-                        break
-                else:
-                    # Wrap around
-                    self.current_match_index = 0
-            else:  # backward
-                for i in range(len(self.matches) - 1, -1, -1):
-                    match = self.matches[i]
-                    if (match.line < cursor_y or
-                        (match.line == cursor_y and match.start < cursor_x)):
-                        self.current_match_index = i
-                        break
-                else:
-                    # Wrap around
-                    self.current_match_index = len(self.matches) - 1
+            position = self._find_from(self.buffer.cursor_y, self.buffer.cursor_x, forward)
+        elif forward:
+            position = self._find_from(0, -1, True)
         else:
-            self.current_match_index = 0 if direction == "forward" else len(self.matches) - 1
-            
-        if self.current_match_index >= 0:
-            match = self.matches[self.current_match_index]
-            return (match.line, match.start)
+            position = self._find_from(len(lines) - 1, len(lines[-1]) + 1, False)
+        self.current_match = position
+        return position
+        
+    def _find_from(self, cursor_y: int, cursor_x: int,
+                   forward: bool) -> Optional[Tuple[int, int]]:
+        """Find the nearest match after (or before) a position, wrapping around."""
+        regex = self.regex
+        pattern, use_regex, whole_word, case_sensitive = self.regex_options
+        if use_regex or whole_word or not case_sensitive:
+            def starts(line):
+                return [match.start() for match in regex.finditer(line)]
+                
+            def first(line):
+                match = regex.search(line)
+                return match.start() if match else -1
+        else:
+            # Plain case-sensitive text needs no regex at all: str.find
+            # gives the same non-overlapping matches as finditer would
+            starts = partial(_find_all, needle=pattern)
+            first = methodcaller('find', pattern)
             
+        lines = self.buffer.lines
+        count = len(lines)
+        cursor_y = 0 if cursor_y < 0 else (count - 1 if cursor_y >= count else cursor_y)
+        
+        if forward:
+            for start in starts(lines[cursor_y]):
+                if start > cursor_x:
+                    return (cursor_y, start)
+            # Then the lines below, wrapping to the top and the cursor line
+            for y in chain(range(cursor_y + 1, count), range(cursor_y + 1)):
+                start = first(lines[y])
+                if start != -1:
+                    return (y, start)
+        else:
+            before = [start for start in starts(lines[cursor_y]) if start < cursor_x]
+            if before:
+                return (cursor_y, before[-1])
+            # Then the lines above, wrapping to the bottom and the cursor line
+            for y in chain(range(cursor_y - 1, -1, -1), range(count - 1, cursor_y - 1, -1)):
+                line_starts = starts(lines[y])
+                if line_starts:
+                    return (y, line_starts[-1])
         return None
         
+    def _collect_matches(self):
+        """Find every match of the current search and locate the current one."""
+        regex = self.regex
+        pattern, use_regex, whole_word, case_sensitive = self.regex_options
+        matches = self.matches
+        matches.clear()
+        lines = self.buffer.lines
+        if use_regex:
+            # A user regex may match a line break (\s, [^x]), so it runs
+            # line by line to keep every match within one line
+            for line_num, line in enumerate(lines):
+                for match in regex.finditer(line):
+                    matches.append(SearchMatch(
+                        line=line_num,
+                        start=match.start(),
+                        end=match.end(),
+                        text=match.group()
+                    ))
+        else:
+            # Literal and whole-word searches never cross a line break, so
+            # the buffer is scanned as one string and each offset mapped
+            # back to (line, column) through a table of line starts
+            text = '\n'.join(lines)
+            starts = [0]
+            starts.extend(accumulate(map((1).__add__, map(len, lines))))
+            if not whole_word and (case_sensitive or
+                                   (pattern.isascii() and text.isascii())):
+                # Plain substring: str.find, with lower() for case folding
+                # where ASCII guarantees the offsets do not shift
+                if case_sensitive:
+                    haystack, needle = text, pattern
+                else:
+                    haystack, needle = text.lower(), pattern.lower()
+                size = len(needle)
+                spans = []
+                pos = haystack.find(needle)
+                while pos != -1:
+                    spans.append((pos, pos + size))
+                    pos = haystack.find(needle, pos + size)
+            else:
+                spans = [match.span() for match in regex.finditer(text)]
+                
+            for start, end in spans:
+                line_num = bisect_right(starts, start) - 1
+                column = start - starts[line_num]
+                matches.append(SearchMatch(line_num, column, column + end - start,
+                                           text[start:end]))
+                
+        # Index of the match search() moved to
+        self.matches_pending = False
+        if self.current_match is not None:
+            keys = [(match.line, match.start) for match in matches]
+            index = bisect_left(keys, self.current_match)
+            self.current_match_index = index if index < len(keys) else -1
+            
     def find_next(self) -> Optional[Tuple[int, int]]:
         """Find next occurrence."""
+        if self.matches_pending:
+            self._collect_matches()
         if not self.matches:
             return self.search(self.last_search, "forward")
             
@@ -118,6 +221,8 @@ class SearchEngine:
         
     def find_previous(self) -> Optional[Tuple[int, int]]:
         """Find previous occurrence."""
+        if self.matches_pending:
+            self._collect_matches()
         if not self.matches:
             return self.search(self.last_search, "backward")
             
@@ -128,47 +233,48 @@ class SearchEngine:
     def replace(self, pattern: str, replacement: str, 
                 flags: str = "") -> int:
         """Replace pattern with replacement."""
-        count = 0
-        
         # Parse flags
         global_replace = 'g' in flags
         confirm = 'c' in flags
         case_insensitive = 'i' in flags
         
         # Build regex
-        regex_flags = 0
-        if case_insensitive or not self.case_sensitive:
-            regex_flags |= re.IGNORECASE
-            
         try:
-            regex = re.compile(pattern, regex_flags)
+            regex = _compile_search(pattern, True, False,
+                                    self.case_sensitive and not case_insensitive)
         except re.error:
             return 0
             
-        # Perform replacement
-        for i, line in enumerate(self.buffer.lines):
-            if global_replace:
-                new_line, n = regex.subn(replacement, line)
-                if n > 0:
-                    self.buffer.lines[i] = new_line
-                    count += n
-            else:
-                match = regex.search(line)
-                if match:
-                    new_line = regex.sub(replacement, line, count=1)
-                    self.buffer.lines[i] = new_line
-                    count += 1
-                    
+        # One subn per line with the count limit bound up front, then a
+        # single bulk store; lines without a match keep their objects
+        subn = regex.subn
+        max_count = 0 if global_replace else 1
+        lines = self.buffer.lines
+        results = [subn(replacement, line, count=max_count) for line in lines]
+        count = sum([n for _, n in results])
         if count > 0:
+            lines[:] = [new_line for new_line, _ in results]
             self.buffer.modified = True
             
-        # Add to replace history
+        # Add to replace history; the deque drops the oldest entry
         self.replace_history.append((pattern, replacement))
-        if len(self.replace_history) > 20:
-            self.replace_history.pop(0)
             
         return count
         
-    def highlight_matches(self) -> List[SearchMatch]:
-        """Get all matches for highlighting."""
-        return self.matches
\ No newline at end of file
+    def highlight_matches(self, y_start: int = 0,
+                          y_end: Optional[int] = None) -> List[SearchMatch]:
+        """Get the matches on lines y_start to y_end (exclusive) for highlighting."""
+        regex = self.regex
+        if regex is None:
+            return []
+            
+        # Only the requested lines are scanned, so a redraw costs the
+        # viewport rather than the whole buffer
+        lines = self.buffer.lines
+        if y_end is None or y_end > len(lines):
+            y_end = len(lines)
+        return [
+            SearchMatch(y, match.start(), match.end(), match.group())
+            for y in range(y_start if y_start > 0 else 0, y_end)
+            for match in regex.finditer(lines[y])
+        ]
\ No newline at end of file
@@ -1,8 +1,10 @@
 """Basic syntax highlighting."""
 
 import re
+from collections import OrderedDict
 from enum import Enum, auto
-from typing import List, Dict, Tuple, Optional
+from functools import lru_cache
+from typing import List, Dict, Pattern, Tuple, Optional
 from dataclasses import dataclass
 
 
@@ -21,16 +23,99 @@ class TokenType(Enum):
 
 @dataclass
 class Token:
-    """Represents a syntax token."""
+    """Represents a syntax token; its text is line[start:end]."""
+    __slots__ = ('type', 'start', 'end')
     type: TokenType
     start: int
     end: int
-    text: str
+
+
+_PYTHON_KEYWORDS = frozenset({
+    'and', 'as', 'assert', 'async', 'await', 'break', 'class', 'continue',
+    'def', 'del', 'elif', 'else', 'except', 'False', 'finally', 'for',
+    'from', 'global', 'if', 'import', 'in', 'is', 'lambda', 'None',
+    'nonlocal', 'not', 'or', 'pass', 'raise', 'return', 'True', 'try',
+    'while', 'with', 'yield'
+})
+
+_JAVASCRIPT_KEYWORDS = frozenset({
+    'async', 'await', 'break', 'case', 'catch', 'class', 'const', 'continue',
+    'debugger', 'default', 'delete', 'do', 'else', 'export', 'extends',
+    'finally', 'for', 'function', 'if', 'import', 'in', 'instanceof', 'let',
+    'new', 'return', 'super', 'switch', 'this', 'throw', 'try', 'typeof',
+    'var', 'void', 'while', 'with', 'yield'
+})
+
+
+def _keyword_pattern(keywords) -> str:
+    """Alternation matching any of the keywords as a whole word."""
+    return r'\b(?:' + '|'.join(sorted(keywords, key=len, reverse=True)) + r')\b'
+
+
+@lru_cache(maxsize=None)
+def _language_scanner(language: str) -> Tuple[Pattern, Tuple[TokenType, ...]]:
+    """Compile a language's patterns into one alternation, once.
+    
+    Group i of the scanner is pattern i, so match.lastindex - 1 indexes
+    the token types; the patterns themselves use no capturing groups.
+    """
+    sources = _pattern_sources(language)
+    scanner = re.compile('|'.join('(' + pattern + ')' for pattern, _ in sources))
+    return scanner, tuple(token_type for _, token_type in sources)
+
+
+def _pattern_sources(language: str) -> Tuple[Tuple[str, TokenType], ...]:
+    """Pattern strings for a language; earlier ones win at the same column."""
+    if language == 'python':
+        return (
+            (r'#.*$', TokenType.COMMENT),
+            (r'""".*?"""', TokenType.STRING),
+            (r"'''.*?'''", TokenType.STRING),
+            (r'"[^"\\]*(?:\\.[^"\\]*)*"', TokenType.STRING),
+            (r"'[^'\\]*(?:\\.[^'\\]*)*'", TokenType.STRING),
+            (r'\b\d+\.?\d*(?:[eE][+-]?\d+)?\b', TokenType.NUMBER),
+            (r'\bdef\s+\w+', TokenType.FUNCTION),
+            (r'\bclass\s+\w+', TokenType.CLASS),
+            (_keyword_pattern(_PYTHON_KEYWORDS), TokenType.KEYWORD),
+            (r'[+\-*/%=<>!&|^~]+', TokenType.OPERATOR),
+        )
+    if language == 'javascript':
+        return (
+            (r'//.*$', TokenType.COMMENT),
+            (r'/\*.*?\*/', TokenType.COMMENT),
+            (r'"[^"\\]*(?:\\.[^"\\]*)*"', TokenType.STRING),
+            (r"'[^'\\]*(?:\\.[^'\\]*)*'", TokenType.STRING),
+            (r'`[^`]*`', TokenType.STRING),
+            (r'\b\d+\.?\d*(?:[eE][+-]?\d+)?\b', TokenType.NUMBER),
+            (r'\bfunction\s+\w+', TokenType.FUNCTION),
+            (r'\bclass\s+\w+', TokenType.CLASS),
+            (_keyword_pattern(_JAVASCRIPT_KEYWORDS), TokenType.KEYWORD),
+            (r'[+\-*/%=<>!&|^~]+', TokenType.OPERATOR),
+        )
+    if language == 'html':
+        return (
+            (r'<!--.*?-->', TokenType.COMMENT),
+            (r'</?[a-zA-Z][^>]*>', TokenType.KEYWORD),
+            (r'"[^"]*"', TokenType.STRING),
+            (r"'[^']*'", TokenType.STRING),
+        )
+    return ()
+
+
+@lru_cache(maxsize=64)
+def _language_for(filename: str) -> Optional[str]:
+    """Map a filename to its language by extension."""
+    for ext, lang in SyntaxHighlighter.LANGUAGES.items():
+        if filename.endswith(ext):
+            return lang
+    return None
 
 
 class SyntaxHighlighter:
     """Basic syntax highlighter for multiple languages."""
     
+    TOKENS_CACHE_SIZE = 4096  # Distinct (language, line) entries kept
+    
     LANGUAGES = {
         '.py': 'python',
         '.js': 'javascript',
@@ -47,29 +132,38 @@ class SyntaxHighlighter:
     
     def __init__(self):
         self.language = None
-        self.tokens_cache: Dict[int, List[Token]] = {}
+        # Least recently used first; keyed on content, not line number,
+        # so edits and scrolling never serve stale tokens
+        self.tokens_cache: Dict[Tuple[Optional[str], str], List[Token]] = OrderedDict()
         
     def detect_language(self, filename: str) -> Optional[str]:
         """Detect language from filename."""
         if not filename:
             return None
             
-        for ext, lang in self.LANGUAGES.items():
-            if filename.endswith(ext):
-                self.language = lang
-                return lang
-                
+        lang = _language_for(filename)
+        if lang is not None:
+            self.language = lang
+            
         # Check shebang
-        return None
+        return lang
         
     def tokenize_line(self, line: str, line_num: int) -> List[Token]:
         """Tokenize a single line."""
-        if line_num in self.tokens_cache:
-            return self.tokens_cache[line_num]
+        if not line:
+            return []
             
-        tokens = []
-        
-        if self.language == 'python':
+        key = (self.language, line)
+        tokens = self.tokens_cache.get(key)
+        if tokens is not None:
+            self.tokens_cache.move_to_end(key)
+            return tokens
+            
+        # Blank and indent-only lines are one normal token in every
+        # language, so they never reach the scanners
+        if line.isspace():
+            tokens = [Token(TokenType.NORMAL, 0, len(line))]
+        elif self.language == 'python':
             tokens = self._tokenize_python(line)
         elif self.language == 'javascript':
             tokens = self._tokenize_javascript(line)
@@ -77,102 +171,45 @@ class SyntaxHighlighter:
             tokens = self._tokenize_html(line)
         else:
             # Default tokenization
-            tokens = [Token(TokenType.NORMAL, 0, len(line), line)]
+            tokens = [Token(TokenType.NORMAL, 0, len(line))]
             
-        self.tokens_cache[line_num] = tokens
+        self.tokens_cache[key] = tokens
+        if len(self.tokens_cache) > self.TOKENS_CACHE_SIZE:
+            self.tokens_cache.popitem(last=False)
         return tokens
         
     def _tokenize_python(self, line: str) -> List[Token]:
         """Tokenize Python code."""
-        tokens = []
-        
-        # Python keywords
-        keywords = {
-            'and', 'as', 'assert', 'async', 'await', 'break', 'class', 'continue',
-            'def', 'del', 'elif', 'else', 'except', 'False', 'finally', 'for',
-            'from', 'global', 'if', 'import', 'in', 'is', 'lambda', 'None',
-            'nonlocal', 'not', 'or', 'pass', 'raise', 'return', 'True', 'try',
-            'while', 'with', 'yield'
-        }
-        
-        patterns = [
-            (r'#.*$', TokenType.COMMENT),
-            (r'""".*?"""', TokenType.STRING),
-            (r"'''.*?'''", TokenType.STRING),
-            (r'"[^"\```*(\\.[^"\```*)*"', TokenType.STRING),
-            (r"'[^'\```*(\\.[^'\```*)*'", TokenType.STRING),
-            (r'\b\d+\.?\d*([eE][+-]?\d+)?\b', TokenType.NUMBER),
-            (r'\bdef\s+(\w+)', TokenType.FUNCTION),
-            (r'\bclass\s+(\w+)', TokenType.CLASS),
-            (r'\b(' + '|'.join(keywords) + r')\b', TokenType.KEYWORD),
-            (r'[+\-*/%=<>!&|^~]+', TokenType.OPERATOR),
-        ]
-        
-        return self._apply_patterns(line, patterns)
+        return self._apply_patterns(line, _language_scanner('python'))
         
     def _tokenize_javascript(self, line: str) -> List[Token]:
         """Tokenize JavaScript code."""
-        keywords = {
-            'async', 'await', 'break', 'case', 'catch', 'class', 'const', 'continue',
-            'debugger', 'default', 'delete', 'do', 'else', 'export', 'extends',
-            'finally', 'for', 'function', 'if', 'import', 'in', 'instanceof', 'let',
-            'new', 'return', 'super', 'switch', 'this', 'throw', 'try', 'typeof',
-            'var', 'void', 'while', 'with', 'yield'
-        }
-        
-        patterns = [
-            (r'//.*$', TokenType.COMMENT),
-            (r'/\*.*?\*/', TokenType.COMMENT),
-            (r'"[^"\```*(\\.[^"\```*)*"', TokenType.STRING),
-            (r"'[^'\```*(\\.[^'\```*)*'", TokenType.STRING),
-            (r'`[^`]*`', TokenType.STRING),
-            (r'\b\d+\.?\d*([eE][+-]?\d+)?\b', TokenType.NUMBER),
-            (r'\bfunction\s+(\w+)', TokenType.FUNCTION),
-            (r'\bclass\s+(\w+)', TokenType.CLASS),
-            (r'\b(' + '|'.join(keywords) + r')\b', TokenType.KEYWORD),
-            (r'[+\-*/%=<>!&|^~]+', TokenType.OPERATOR),
-        ]
-        
-        return self._apply_patterns(line, patterns)
+        return self._apply_patterns(line, _language_scanner('javascript'))
         
     def _tokenize_html(self, line: str) -> List[Token]:
         """Tokenize HTML code."""
-        patterns = [
-            (r'<!--.*?-->', TokenType.COMMENT),
-            (r'</?[a-zA-Z][^>]*>', TokenType.KEYWORD),
-            (r'"[^"]*"', TokenType.STRING),
-            (r"'[^']*'", TokenType.STRING),
-        ]
-        
-        return self._apply_patterns(line, patterns)
-        
-    def _apply_patterns(self, line: str, patterns: List[Tuple[str, TokenType]]) -> List[Token]:
-        """Apply regex patterns to tokenize line."""
-        tokens = []
-        covered = set()
+        return self._apply_patterns(line, _language_scanner('html'))
         
-        for pattern, token_type in patterns:
-            for match in re.finditer(pattern, line):
-                start, end = match.span()
-                
-                # Check if this range is already covered
-                if not any(start <= i < end for i in covered):
-                    tokens.append(Token(token_type, start, end, match.group()))
-                    covered.update(range(start, end))
-                    
-        # Fill gaps with normal tokens
-        tokens.sort(key=lambda t: t.start)
+    def _apply_patterns(self, line: str,
+                        scanner: Tuple[Pattern, Tuple[TokenType, ...]]) -> List[Token]:
+        """Tokenize line in one left-to-right pass of a language scanner."""
+        pattern, token_types = scanner
+        normal = TokenType.NORMAL
         result = []
+        append = result.append
         pos = 0
         
-        for token in tokens:
-            if pos < token.start:
-                result.append(Token(TokenType.NORMAL, pos, token.start, line[pos:token.start]))
-            result.append(token)
-            pos = token.end
+        # Tokens come out in order and never overlap, so the gaps between
+        # them are filled with normal tokens as they go; no sort is needed
+        for match in pattern.finditer(line):
+            start, end = match.span()
+            if pos < start:
+                append(Token(normal, pos, start))
+            append(Token(token_types[match.lastindex - 1], start, end))
+            pos = end
             
         if pos < len(line):
-            result.append(Token(TokenType.NORMAL, pos, len(line), line[pos:]))
+            append(Token(normal, pos, len(line)))
             
         return result
         
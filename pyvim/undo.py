@@ -1,67 +1,161 @@
 """Undo/Redo system implementation."""
 
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional, Any
-from copy import deepcopy
-import pickle
+from itertools import islice
+from typing import Deque, List, Optional, Any, Tuple
 import os
+import struct
+import tempfile
+import zlib
 
 @dataclass
 class UndoState:
     """Represents a state in the undo history."""
+    __slots__ = ('lines', 'cursor_x', 'cursor_y', 'timestamp', 'description')
     lines: List[str]
     cursor_x: int
     cursor_y: int
     timestamp: float
-    description: str = ""
+    description: str
+
+# Persistent undo file layout: magic, then zlib data holding a header
+# (save index, state count) and per state its fixed fields, description,
+# the length of each line and the lines' text run together. Lines may
+# themselves contain line breaks, so they are cut by length, not split
+_UNDO_MAGIC = b'PYVIMUNDO2\n'
+_UNDO_HEADER = struct.Struct('<iI')
+_UNDO_STATE = struct.Struct('<QQdIII')  # cursor x/y, time, line count, byte lengths
+
+def _encode_states(states: List[UndoState], save_index: int) -> bytes:
+    """Serialize undo states into the persistent undo format."""
+    parts = [_UNDO_HEADER.pack(save_index, len(states))]
+    for state in states:
+        lines = state.lines
+        description = state.description.encode('utf-8', 'surrogatepass')
+        text = ''.join(lines).encode('utf-8', 'surrogatepass')
+        parts.append(_UNDO_STATE.pack(state.cursor_x, state.cursor_y, state.timestamp,
+                                      len(lines), len(description), len(text)))
+        parts.append(description)
+        parts.append(struct.pack('<%dI' % len(lines), *map(len, lines)))
+        parts.append(text)
+    return _UNDO_MAGIC + zlib.compress(b''.join(parts), 1)
+
+def _decode_states(data: bytes) -> Tuple[List[UndoState], int]:
+    """Parse the persistent undo format; raises ValueError if it is not one."""
+    if not data.startswith(_UNDO_MAGIC):
+        raise ValueError("Not a pyvim undo file")
+    data = zlib.decompress(data[len(_UNDO_MAGIC):])
+    save_index, count = _UNDO_HEADER.unpack_from(data)
+    pos = _UNDO_HEADER.size
+    states = []
+    for _ in range(count):
+        cursor_x, cursor_y, timestamp, line_count, desc_len, text_len = \
+            _UNDO_STATE.unpack_from(data, pos)
+        pos += _UNDO_STATE.size
+        description = data[pos:pos + desc_len].decode('utf-8', 'surrogatepass')
+        pos += desc_len
+        lengths = struct.unpack_from('<%dI' % line_count, data, pos)
+        pos += 4 * line_count
+        text = data[pos:pos + text_len].decode('utf-8', 'surrogatepass')
+        pos += text_len
+        # Line lengths are in characters and must account for all the text
+        lines = []
+        start = 0
+        for length in lengths:
+            lines.append(text[start:start + length])
+            start += length
+        if start != len(text):
+            raise ValueError("Corrupt undo state")
+        states.append(UndoState(lines, cursor_x, cursor_y, timestamp, description))
+    return states, save_index
 
 class UndoManager:
     """Manages undo/redo operations."""
 
+    # Edits folded into a single undo step when repeated in a quick burst
+    COALESCE_DESCRIPTIONS = {"Insert character", "Delete character", "Delete at cursor"}
+    COALESCE_WINDOW = 1.0  # seconds
+
     def __init__(self, buffer):
         self.buffer = buffer
-        self.undo_stack: List[UndoState] = []
-        self.redo_stack: List[UndoState] = []
         self.max_undo_levels = 1000
+        # Bounded undo history; the oldest state falls off when it is full
+        self.undo_stack: Deque[UndoState] = deque(maxlen=self.max_undo_levels)
+        self.redo_stack: List[UndoState] = []
+        # States dropped off the front, so that undo_stack indexes plus
+        # this count stay comparable with last_save_index
+        self.dropped_states = 0
         self.last_save_index = -1
         self.persistent_undo_file = None
+        self.persisted = None  # (newest state, history length, save index) last written
+        self.last_edit = None  # (description, cursor_y, time) of last coalescable edit
+        self.batch_depth = 0  # Nesting of Buffer.batch_edit blocks
+        self.batch_description: Optional[str] = None  # Set until a batch snapshots
 
     def save_state(self, description: str = ""):
         """Save current buffer state to undo stack."""
+        # Inside a batch only the first edit snapshots, under the batch's
+        # description; that snapshot covers every later edit. A batch
+        # that edits nothing leaves the undo and redo stacks alone
+        if self.batch_depth:
+            if self.batch_description is None:
+                return
+            description = self.batch_description
+            self.batch_description = None
+            
         import time
 
+        now = time.time()
+
+        # Fold a burst of character edits on one line into one step; the
+        # snapshot taken before the first edit of the burst covers them all
+        if description in self.COALESCE_DESCRIPTIONS:
+            last = self.last_edit
+            self.last_edit = (description, self.buffer.cursor_y, now)
+            if (last and last[0] == description
+                    and last[1] == self.buffer.cursor_y
+                    and now - last[2] < self.COALESCE_WINDOW):
+                self.redo_stack.clear()
+                return
+        else:
+            self.last_edit = None
+
         state = UndoState(
-            lines=deepcopy(self.buffer.lines),
+            lines=self.buffer.lines[:],
             cursor_x=self.buffer.cursor_x,
             cursor_y=self.buffer.cursor_y,
-            timestamp=time.time(),
+            timestamp=now,
             description=description
         )
 
+        if len(self.undo_stack) == self.undo_stack.maxlen:
+            self.dropped_states += 1
         self.undo_stack.append(state)
         self.redo_stack.clear()  # Clear redo stack on new change
 
-        # Limit undo stack size
-        if len(self.undo_stack) > self.max_undo_levels:
-            self.undo_stack.pop(0)
-
     def undo(self) -> bool:
         """Undo last change."""
         if not self.undo_stack:
             return False
+        self.last_edit = None
         
         # Save current state to redo stack
+        # The buffer's list is replaced below, so it is handed over as is
         current_state = UndoState(
-            lines=deepcopy(self.buffer.lines),
+            lines=self.buffer.lines,
             cursor_x=self.buffer.cursor_x,
             cursor_y=self.buffer.cursor_y,
             timestamp=0,
+            description="",
         )
         self.redo_stack.append(current_state)
 
         # Restore previous state
+        # Popped states are referenced nowhere else; the buffer takes the
+        # list itself rather than a copy
         state = self.undo_stack.pop()
-        self.buffer.lines = deepcopy(state.lines)
+        self.buffer.lines = state.lines
         self.buffer.cursor_x = state.cursor_x
         self.buffer.cursor_y = state.cursor_y
 
@@ -71,19 +165,24 @@ class UndoManager:
         """Redo previously undone change."""
         if not self.redo_stack:
             return False
+        self.last_edit = None
         
         # Save current state to undo stack
+        # The buffer's list is replaced below, so it is handed over as is
         current_state = UndoState(
-            lines=deepcopy(self.buffer.lines),
+            lines=self.buffer.lines,
             cursor_x=self.buffer.cursor_x,
             cursor_y=self.buffer.cursor_y,
             timestamp=0,
+            description="",
         )
+        if len(self.undo_stack) == self.undo_stack.maxlen:
+            self.dropped_states += 1
         self.undo_stack.append(current_state)
 
         # Restore redo state
         state = self.redo_stack.pop()
-        self.buffer.lines = deepcopy(state.lines)
+        self.buffer.lines = state.lines
         self.buffer.cursor_x = state.cursor_x
         self.buffer.cursor_y = state.cursor_y
 
@@ -91,11 +190,11 @@ class UndoManager:
     
     def mark_save_point(self):
         """Mark current position as save point."""
-        self.last_save_index = len(self.undo_stack) - 1
+        self.last_save_index = self.dropped_states + len(self.undo_stack) - 1
 
     def is_modified(self) -> bool:
         """Check if buffer has been modified since last save."""
-        current_index = len(self.max_undo_levels) - 1
+        current_index = self.dropped_states + len(self.undo_stack) - 1
         return current_index != self.last_save_index
     
     def save_persistent_undo(self, filename: str):
@@ -106,14 +205,33 @@ class UndoManager:
         undo_file = os.path.join(undo_dir,
                                  filename.replace('/', '%').replace('\\', '%') + '.undo')
         
+        # Nothing to write if the history is the one already on disk
+        stack = self.undo_stack
+        key = (stack[-1] if stack else None, self.dropped_states + len(stack),
+               self.last_save_index)
+        persisted = self.persisted
+        if persisted is not None and persisted[0] is key[0] and persisted[1:] == key[1:]:
+            return
+            
+        # Only the newest 100 states are kept; the save point is stored
+        # relative to them
+        skipped = max(len(stack) - 100, 0)
+        tmp_name = None
         try:
-            with open(undo_file, 'wb') as f:
-                pickle.dump({
-                    'undo_stack': self.undo_stack[-100:],
-                    'last_save_index': self.last_save_index
-                }, f)
+            data = _encode_states(list(islice(stack, skipped, None)),
+                                  self.last_save_index - self.dropped_states - skipped)
+            fd, tmp_name = tempfile.mkstemp(dir=undo_dir,
+                                            prefix='.' + os.path.basename(undo_file))
+            with open(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_name, undo_file)
+            self.persisted = key
         except Exception:
-            pass
+            if tmp_name is not None:
+                try:
+                    os.remove(tmp_name)
+                except OSError:
+                    pass
 
     def load_persistent_undo(self, filename: str):
         """Load undo history from file."""
@@ -124,8 +242,9 @@ class UndoManager:
         if os.path.exists(undo_file):
             try:
                 with open(undo_file, 'rb') as f:
-                    data = pickle.load(f)
-                    self.undo_stack = data['undo_stack']
-                    self.last_save_index = data['last_save_index']
+                    states, save_index = _decode_states(f.read())
+                self.undo_stack = deque(states, maxlen=self.max_undo_levels)
+                self.dropped_states = 0
+                self.last_save_index = save_index
             except Exception:
                 pass
\ No newline at end of file
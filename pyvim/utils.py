@@ -2,9 +2,34 @@
 
 import os
 import re
+import shutil
+from functools import lru_cache, partial
 from typing import List, Tuple, Optional
 
 
+# Run of word characters (alphanumerics and underscore)
+_WORD_RE = re.compile(r'\w*')
+# Everything up to and including the last non-word character; matched
+# with endpos at the cursor, its end is where the cursor's word starts
+_WORD_START_RE = re.compile(r'.*\W')
+
+# Bracket -> (pattern matching either bracket of its pair, scan direction)
+_PARENS = re.compile(r'[()]')
+_SQUARE = re.compile(r'[\[\]]')
+_BRACES = re.compile(r'[{}]')
+_BRACKETS = {
+    '(': (_PARENS, 1), ')': (_PARENS, -1),
+    '[': (_SQUARE, 1), ']': (_SQUARE, -1),
+    '{': (_BRACES, 1), '}': (_BRACES, -1),
+}
+
+
+@lru_cache(maxsize=64)
+def compile_pattern(pattern: str, flags: int = 0) -> 're.Pattern':
+    """Compile a regex pattern, reusing previously compiled patterns."""
+    return re.compile(pattern, flags)
+
+
 def expand_tabs(text: str, tab_size: int = 4) -> str:
     """Expand tabs to spaces."""
     return text.replace('\t', ' ' * tab_size)
@@ -15,15 +40,15 @@ def get_word_at_cursor(line: str, cursor_x: int) -> Tuple[str, int, int]:
     if cursor_x >= len(line):
         return "", cursor_x, cursor_x
         
-    # Find word boundaries
-    word_pattern = re.compile(r'\w+')
+    # Scan outwards from the cursor instead of matching every word on
+    # the line; neither scan copies the line
+    end = _WORD_RE.match(line, cursor_x).end()
+    if end == cursor_x:
+        return "", cursor_x, cursor_x
+    match = _WORD_START_RE.match(line, 0, cursor_x)
+    start = match.end() if match else 0
     
-    for match in word_pattern.finditer(line):
-        start, end = match.span()
-        if start <= cursor_x < end:
-            return match.group(), start, end
-            
-    return "", cursor_x, cursor_x
+    return line[start:end], start, end
 
 
 def find_matching_bracket(lines: List[str], cursor_y: int, cursor_x: int) -> Optional[Tuple[int, int]]:
@@ -32,47 +57,30 @@ def find_matching_bracket(lines: List[str], cursor_y: int, cursor_x: int) -> Opt
         return None
         
     char = lines[cursor_y][cursor_x]
-    
-    brackets = {
-        '(': (')', 1),
-        ')': ('(', -1),
-        '[': (']', 1),
-        ']': ('[', -1),
-        '{': ('}', 1),
-        '}': ('{', -1),
-    }
-    
-    if char not in brackets:
+    entry = _BRACKETS.get(char)
+    if entry is None:
         return None
         
-    match_char, direction = brackets[char]
-    count = 1
-    y, x = cursor_y, cursor_x
-    
-    while True:
-        x += direction
-        
-        # Move to next/previous line if needed
-        if direction > 0 and x >= len(lines[y]):
-            y += 1
-            if y >= len(lines):
-                break
-            x = 0
-        elif direction < 0 and x < 0:
-            y -= 1
-            if y < 0:
-                break
-            x = len(lines[y]) - 1
-            
-        current_char = lines[y][x] if x < len(lines[y]) else ''
-        
-        if current_char == char:
-            count += 1
-        elif current_char == match_char:
-            count -= 1
-            if count == 0:
-                return (y, x)
-                
+    # Only the brackets of this pair are visited; the regex skips the
+    # text between them in C. The scan starts on the cursor's bracket
+    pattern, direction = entry
+    depth = 0
+    if direction > 0:
+        for y in range(cursor_y, len(lines)):
+            line = lines[y]
+            for match in pattern.finditer(line, cursor_x if y == cursor_y else 0):
+                depth += 1 if match.group() == char else -1
+                if depth == 0:
+                    return (y, match.start())
+    else:
+        for y in range(cursor_y, -1, -1):
+            line = lines[y]
+            end = cursor_x + 1 if y == cursor_y else len(line)
+            for x in reversed([match.start() for match in pattern.finditer(line, 0, end)]):
+                depth += 1 if line[x] == char else -1
+                if depth == 0:
+                    return (y, x)
+                    
     return None
 
 
@@ -84,9 +92,8 @@ def create_backup(filename: str) -> bool:
     backup_name = filename + "~"
     
     try:
-        with open(filename, 'rb') as src:
-            with open(backup_name, 'wb') as dst:
-                dst.write(src.read())
+        # Streams in chunks, or copies in the kernel where the platform can
+        shutil.copyfile(filename, backup_name)
         return True
     except Exception:
         return False
@@ -95,21 +102,41 @@ def create_backup(filename: str) -> bool:
 def get_file_info(filename: str) -> dict:
     """Get file information."""
     info = {
-        'exists': os.path.exists(filename),
+        'exists': False,
         'size': 0,
         'lines': 0,
         'readable': False,
         'writable': False,
     }
     
-    if info['exists']:
-        info['size'] = os.path.getsize(filename)
+    # One stat answers both "exists" and "size"
+    try:
+        st = os.stat(filename)
+    except OSError:
+        st = None
+        
+    if st is not None:
+        info['exists'] = True
+        info['size'] = st.st_size
         info['readable'] = os.access(filename, os.R_OK)
         info['writable'] = os.access(filename, os.W_OK)
         
+        # Count line breaks in large binary chunks rather than decoding
+        # the file into a string per line. \n, \r\n and a lone \r each
+        # end a line, as in text mode; a final line without one still
+        # counts
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                info['lines'] = sum(1 for _ in f)
+            count = 0
+            last = b'\n'
+            with open(filename, 'rb') as f:
+                for chunk in iter(partial(f.read, 1 << 20), b''):
+                    count += (chunk.count(b'\n') + chunk.count(b'\r')
+                              - chunk.count(b'\r\n'))
+                    # A \r\n split across chunks was counted twice
+                    if last == b'\r' and chunk[:1] == b'\n':
+                        count -= 1
+                    last = chunk[-1:]
+            info['lines'] = count if last in (b'\n', b'\r') else count + 1
         except:
             pass
             
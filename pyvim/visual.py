@@ -15,12 +15,35 @@ class VisualMode(Enum):
 @dataclass
 class Selection:
     """Represents a visual selection."""
+    # _bounds holds the corners in document order, worked out on first
+    # use after a change
+    __slots__ = ('start_y', 'start_x', 'end_y', 'end_x', 'mode', '_bounds')
     start_y: int
     start_x: int
     end_y: int
     end_x: int
     mode: VisualMode
     
+    def __post_init__(self):
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+        
+    def set_end(self, y: int, x: int):
+        """Move the end point of the selection."""
+        self.end_y = y
+        self.end_x = x
+        self._bounds = None
+        
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """Return (start_y, start_x, end_y, end_x) in document order."""
+        bounds = self._bounds
+        if bounds is None:
+            if self.start_y > self.end_y or (self.start_y == self.end_y and self.start_x > self.end_x):
+                bounds = (self.end_y, self.end_x, self.start_y, self.start_x)
+            else:
+                bounds = (self.start_y, self.start_x, self.end_y, self.end_x)
+            self._bounds = bounds
+        return bounds
+        
     def normalize(self) -> 'Selection':
         """Normalize selection coordinates."""
         if self.start_y > self.end_y or (self.start_y == self.end_y and self.start_x > self.end_x):
@@ -33,27 +56,17 @@ class Selection:
         
     def contains(self, y: int, x: int) -> bool:
         """Check if position is within selection."""
-        norm = self.normalize()
+        start_y, start_x, end_y, end_x = self.bounds()
+        mode = self.mode
         
-        if self.mode == VisualMode.LINE:
-            return norm.start_y <= y <= norm.end_y
-            
-        elif self.mode == VisualMode.CHARACTER:
-            if y < norm.start_y or y > norm.end_y:
-                return False
-            if y == norm.start_y and x < norm.start_x:
-                return False
-            if y == norm.end_y and x > norm.end_x:
-                return False
-            return True
-            
-        elif self.mode == VisualMode.BLOCK:
-            if y < norm.start_y or y > norm.end_y:
-                return False
-            min_x = min(norm.start_x, norm.end_x)
-            max_x = max(norm.start_x, norm.end_x)
-            return min_x <= x <= max_x
-            
+        # Character selections order positions lexicographically, which
+        # is exactly a tuple comparison
+        if mode is VisualMode.CHARACTER:
+            return (start_y, start_x) <= (y, x) <= (end_y, end_x)
+        if mode is VisualMode.LINE:
+            return start_y <= y <= end_y
+        if mode is VisualMode.BLOCK:
+            return start_y <= y <= end_y and (start_x <= x <= end_x or end_x <= x <= start_x)
         return False
 
 
@@ -64,10 +77,12 @@ class VisualModeHandler:
         self.buffer = buffer
         self.selection: Optional[Selection] = None
         self.mode: Optional[VisualMode] = None
+        self.is_line_mode = False  # mode == VisualMode.LINE, kept in step
         
     def start_selection(self, mode: VisualMode):
         """Start visual selection."""
         self.mode = mode
+        self.is_line_mode = mode == VisualMode.LINE
         self.selection = Selection(
             self.buffer.cursor_y,
             self.buffer.cursor_x,
@@ -79,55 +94,50 @@ class VisualModeHandler:
     def update_selection(self):
         """Update selection end point to cursor position."""
         if self.selection:
-            self.selection.end_y = self.buffer.cursor_y
-            self.selection.end_x = self.buffer.cursor_x
+            self.selection.set_end(self.buffer.cursor_y, self.buffer.cursor_x)
             
     def clear_selection(self):
         """Clear visual selection."""
         self.selection = None
         self.mode = None
+        self.is_line_mode = False
         
-    def get_selected_text(self) -> str:
-        """Get selected text."""
+    def get_selected_lines(self) -> List[str]:
+        """Get selected text as a list of lines."""
         if not self.selection:
-            return ""
+            return []
             
         norm = self.selection.normalize()
-        lines = []
+        buffer_lines = self.buffer.lines
         
         if self.selection.mode == VisualMode.LINE:
-            for y in range(norm.start_y, norm.end_y + 1):
-                if y < len(self.buffer.lines):
-                    lines.append(self.buffer.lines[y])
-                    
-        elif self.selection.mode == VisualMode.CHARACTER:
+            return buffer_lines[norm.start_y:norm.end_y + 1]
+            
+        lines = []
+        
+        if self.selection.mode == VisualMode.CHARACTER:
             if norm.start_y == norm.end_y:
                 # Single line selection
-                line = self.buffer.lines[norm.start_y]
+                line = buffer_lines[norm.start_y]
                 lines.append(line[norm.start_x:norm.end_x + 1])
             else:
-                # Multi-line selection
-                # First line
-                lines.append(self.buffer.lines[norm.start_y][norm.start_x:])
-                # Middle lines
-                for y in range(norm.start_y + 1, norm.end_y):
-                    lines.append(self.buffer.lines[y])
-                # Last line
-                lines.append(self.buffer.lines[norm.end_y][:norm.end_x + 1])
+                # Multi-line selection: partial first and last lines
+                # around a slice of the whole ones between them
+                lines.append(buffer_lines[norm.start_y][norm.start_x:])
+                lines.extend(buffer_lines[norm.start_y + 1:norm.end_y])
+                lines.append(buffer_lines[norm.end_y][:norm.end_x + 1])
                 
         elif self.selection.mode == VisualMode.BLOCK:
-            min_x = min(norm.start_x, norm.end_x)
-            max_x = max(norm.start_x, norm.end_x)
+            # Column bounds worked out once, then one slice per line
+            lo = min(norm.start_x, norm.end_x)
+            hi = max(norm.start_x, norm.end_x) + 1
+            lines = [line[lo:hi] for line in buffer_lines[norm.start_y:norm.end_y + 1]]
             
-            for y in range(norm.start_y, norm.end_y + 1):
-                if y < len(self.buffer.lines):
-                    line = self.buffer.lines[y]
-                    if min_x < len(line):
-                        lines.append(line[min_x:min(max_x + 1, len(line))])
-                    else:
-                        lines.append("")
-                        
-        return '\n'.join(lines)
+        return lines
+        
+    def get_selected_text(self) -> str:
+        """Get selected text."""
+        return '\n'.join(self.get_selected_lines())
         
     def delete_selection(self):
         """Delete selected text."""
@@ -165,14 +175,15 @@ class VisualModeHandler:
             min_x = min(norm.start_x, norm.end_x)
             max_x = max(norm.start_x, norm.end_x)
             
-            for y in range(norm.start_y, norm.end_y + 1):
-                if y < len(self.buffer.lines):
-                    line = self.buffer.lines[y]
-                    if min_x < len(line):
-                        self.buffer.lines[y] = (
-                            line[:min_x] + line[min(max_x + 1, len(line)):]
-                        )
-                        
+            # Cut the columns out of every line, then store them back in
+            # one splice; lines too short to reach the block are kept
+            lines = self.buffer.lines
+            block = slice(norm.start_y, norm.end_y + 1)
+            lines[block] = [
+                line[:min_x] + line[max_x + 1:] if min_x < len(line) else line
+                for line in lines[block]
+            ]
+            
             self.buffer.cursor_y = norm.start_y
             self.buffer.cursor_x = min_x
             
@@ -14,6 +14,7 @@ class SplitType(Enum):
 @dataclass
 class WindowLayout:
     """Represents a window's layout."""
+    __slots__ = ('x', 'y', 'width', 'height')
     x: int
     y: int
     width: int
@@ -38,25 +39,29 @@ class Window:
         
     def is_cursor_visible(self) -> bool:
         """Check if cursor is within visible area."""
-        if self.cursor_y < self.offset_y or self.cursor_y >= self.offset_y + self.layout.height:
-            return False
-        if self.cursor_x < self.offset_x or self.cursor_x >= self.offset_x + self.layout.width:
-            return False
-        return True
+        layout = self.layout
+        return (self.offset_y <= self.cursor_y < self.offset_y + layout.height
+                and self.offset_x <= self.cursor_x < self.offset_x + layout.width)
         
     def adjust_viewport(self):
         """Adjust viewport to keep cursor visible."""
+        layout = self.layout
+        cursor_y = self.cursor_y
+        cursor_x = self.cursor_x
+        
         # Vertical adjustment
-        if self.cursor_y < self.offset_y:
-            self.offset_y = self.cursor_y
-        elif self.cursor_y >= self.offset_y + self.layout.height - 1:
-            self.offset_y = self.cursor_y - self.layout.height + 2
+        offset_y = self.offset_y
+        if cursor_y < offset_y:
+            self.offset_y = cursor_y
+        elif cursor_y >= offset_y + layout.height - 1:
+            self.offset_y = cursor_y - layout.height + 2
             
         # Horizontal adjustment
-        if self.cursor_x < self.offset_x:
-            self.offset_x = self.cursor_x
-        elif self.cursor_x >= self.offset_x + self.layout.width - 1:
-            self.offset_x = self.cursor_x - self.layout.width + 2
+        offset_x = self.offset_x
+        if cursor_x < offset_x:
+            self.offset_x = cursor_x
+        elif cursor_x >= offset_x + layout.width - 1:
+            self.offset_x = cursor_x - layout.width + 2
 
 
 class WindowManager:
@@ -147,17 +152,14 @@ class WindowManager:
         if not self.windows:
             return
             
-        # Simple equal distribution for now
-        height_per_window = self.screen_height // len(self.windows)
-        y_offset = 0
-        
-        for window in self.windows:
-            window.layout.x = 0
-            window.layout.y = y_offset
-            window.layout.width = self.screen_width
-            window.layout.height = height_per_window
-            y_offset += height_per_window
-            
-        # Give remaining space to last window
-        if self.windows:
-            self.windows[-1].layout.height += self.screen_height % len(self.windows)
\ No newline at end of file
+        # Simple equal distribution for now: full-width rows of equal
+        # height, remaining rows going to the last window. The layouts
+        # are built first and handed out in one pass
+        windows = self.windows
+        count = len(windows)
+        height, extra = divmod(self.screen_height, count)
+        width = self.screen_width
+        layouts = [WindowLayout(0, i * height, width, height) for i in range(count)]
+        layouts[-1].height += extra
+        for window, layout in zip(windows, layouts):
+            window.layout = layout